@@ -1,70 +1,92 @@
 import re
+import argparse
 import csv
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import pandas as pd
 
+# Mapping of truncated/misspelled languages to correct names
+LANGUAGE_CORRECTIONS = {
+    'englis': 'English',
+    'spanis': 'Spanish',
+    'portugues': 'Portuguese',
+    'japanes': 'Japanese',
+    'frenc': 'French',
+    'german': 'German',
+    'italian': 'Italian',
+    'romanain': 'Romanian',
+}
+
+# Standard language map
+LANGUAGE_MAP = {
+    'english': 'English', 'spanish': 'Spanish', 'french': 'French', 
+    'german': 'German', 'portuguese': 'Portuguese', 'italian': 'Italian', 
+    'russian': 'Russian', 'chinese': 'Chinese', 'japanese': 'Japanese', 
+    'turkish': 'Turkish', 'urdu': 'Urdu', 'serbian': 'Serbian',
+    'bosnian': 'Bosnian', 'croatian': 'Croatian', 'farsi': 'Farsi', 
+    'arabic': 'Arabic', 'romanian': 'Romanian', 'mongolian': 'Mongolian', 
+    'indonesian': 'Indonesian', 'afrikaans': 'Afrikaans', 'hebrew': 'Hebrew', 
+    'shona': 'Shona', 'thai': 'Thai', 'polish': 'Polish', 
+    'swedish': 'Swedish', 'bahasa indonesia': 'Indonesian'
+}
+
+# Proficiency levels, checked in this order
+PROFICIENCY_LEVELS = [
+    ('Mother Tongue', ['mother', 'native', 'mother tongue']),
+    ('Professional', ['professional', 'fluent', 'c2', 'business']),
+    ('Intermediate', ['intermediate', 'middle']),
+    ('Elementary', ['elementary', 'basic', 'average']),
+]
+
+def compile_matcher(patterns):
+    """One regex finding every pattern at every position, and each pattern's (priority, value)"""
+    # The pattern that wins is the one listed first among those found anywhere in the text,
+    # not the leftmost one; the lookahead lets matches overlap so none of them hides another.
+    priorities = {}
+    for pattern, value in patterns:
+        priorities.setdefault(pattern, (len(priorities), value))
+    alternation = '|'.join(re.escape(pattern) for pattern in priorities)
+    return re.compile(f"(?=({alternation}))"), priorities
+
+def best_match(matcher, text):
+    regex, priorities = matcher
+    found = [priorities[m.group(1)] for m in regex.finditer(text)]
+    return min(found)[1] if found else None
+
+# Truncated names come before the standard map, as they always have
+LANGUAGE_MATCHER = compile_matcher(list(LANGUAGE_CORRECTIONS.items()) + list(LANGUAGE_MAP.items()))
+PROFICIENCY_MATCHER = compile_matcher([(pattern, level) for level, patterns in PROFICIENCY_LEVELS for pattern in patterns])
+
+MOTHER_TONGUE_INDICATORS = ['mother tongue', 'native', 'mother language']
+SPLIT_PATTERN = re.compile(r',|-')
+PARENTHESES_PATTERN = re.compile(r'\(.*?\)', re.IGNORECASE)
+LANGUAGE_PATTERN = re.compile(r'(\w+)\s*(?:\(.*?\))?\s*-?\s*([a-zA-Z\s]+)?', re.IGNORECASE)
+
+@lru_cache(maxsize=None)
 def clean_language_name(lang):
     """Clean and standardize language names"""
-    # Mapping of truncated/misspelled languages to correct names
-    language_corrections = {
-        'englis': 'English',
-        'spanis': 'Spanish',
-        'portugues': 'Portuguese',
-        'japanes': 'Japanese',
-        'frenc': 'French',
-        'german': 'German',
-        'italian': 'Italian',
-        'romanain': 'Romanian',
-    }
-    
     # Normalize unicode characters
     lang = unicodedata.normalize('NFKD', lang).encode('ASCII', 'ignore').decode('ASCII')
     
-    # Check for truncated language names first
-    lang_lower = lang.lower().strip()
-    for trunc, full in language_corrections.items():
-        if trunc in lang_lower:
-            return full
-    
-    # Standard language map
-    language_map = {
-        'english': 'English', 'spanish': 'Spanish', 'french': 'French', 
-        'german': 'German', 'portuguese': 'Portuguese', 'italian': 'Italian', 
-        'russian': 'Russian', 'chinese': 'Chinese', 'japanese': 'Japanese', 
-        'turkish': 'Turkish', 'urdu': 'Urdu', 'serbian': 'Serbian',
-        'bosnian': 'Bosnian', 'croatian': 'Croatian', 'farsi': 'Farsi', 
-        'arabic': 'Arabic', 'romanian': 'Romanian', 'mongolian': 'Mongolian', 
-        'indonesian': 'Indonesian', 'afrikaans': 'Afrikaans', 'hebrew': 'Hebrew', 
-        'shona': 'Shona', 'thai': 'Thai', 'polish': 'Polish', 
-        'swedish': 'Swedish', 'bahasa indonesia': 'Indonesian'
-    }
-    
-    # Apply standard cleaning
-    for key, value in language_map.items():
-        if key in lang_lower:
-            return value
+    # Truncated language names win over the standard map
+    language = best_match(LANGUAGE_MATCHER, lang.lower().strip())
+    if language is not None:
+        return language
     
     return lang.strip().capitalize()
 
 def standardize_proficiency(prof):
     """Standardize proficiency levels"""
-    prof = str(prof).lower().strip()
-    
-    if 'mother' in prof or 'native' in prof or 'mother tongue' in prof:
-        return 'Mother Tongue'
-    elif 'professional' in prof or 'fluent' in prof or 'c2' in prof or 'business' in prof:
-        return 'Professional'
-    elif 'intermediate' in prof or 'middle' in prof:
-        return 'Intermediate'
-    elif 'elementary' in prof or 'basic' in prof or 'average' in prof:
-        return 'Elementary'
-    return None
+    return best_match(PROFICIENCY_MATCHER, str(prof).lower().strip())
 
+# typed, so that 1 and 1.0 from a numeric cell aren't served each other's result
+@lru_cache(maxsize=None, typed=True)
 def parse_language_entry(entry):
     """Parse a single language entry"""
     entry = str(entry).strip('"').strip()
     
-    parts = re.split(r',|-', entry)
+    parts = SPLIT_PATTERN.split(entry)
     
     mother_tongue = None
     other_languages = []
@@ -73,13 +95,13 @@ def parse_language_entry(entry):
         part = part.strip()
         
         if not mother_tongue:
-            for indicator in ['mother tongue', 'native', 'mother language']:
+            for indicator in MOTHER_TONGUE_INDICATORS:
                 if indicator in part.lower():
-                    lang = re.sub(r'\(.*?\)', '', part, flags=re.IGNORECASE).strip()
+                    lang = PARENTHESES_PATTERN.sub('', part).strip()
                     mother_tongue = clean_language_name(lang.replace(indicator, '').strip())
                     break
         
-        match = re.match(r'(\w+)\s*(?:\(.*?\))?\s*-?\s*([a-zA-Z\s]+)?', part, re.IGNORECASE)
+        match = LANGUAGE_PATTERN.match(part)
         if match:
             lang = clean_language_name(match.group(1))
             prof = standardize_proficiency(match.group(2) or '')
@@ -95,21 +117,98 @@ def parse_language_entry(entry):
     
     return mother_tongue, ', '.join(other_languages) if other_languages else None
 
-def process_language_data(input_file):
+PARSE_MODES = ('vectorized', 'cells')
+
+def split_language_parts(entries):
+    """Vectorized first half of parse_language_entry: one row per comma/dash separated part"""
+    # Columns: 'entry' (position in entries), 'indicator_lang' and 'lang' (cleaned names or None) and 'prof'
+    text = entries.str.strip('"').str.strip()
+    parts = text.str.split(SPLIT_PATTERN.pattern, regex=True).explode().str.strip()
+    parts = pd.DataFrame({'entry': parts.index.to_numpy(), 'part': parts.to_numpy()})
+    lowered = parts['part'].str.lower()
+
+    # Part naming the mother tongue, with the first indicator found (in list order) taken out
+    indicator_lang = pd.Series(None, index=parts.index, dtype=object)
+    unset = pd.Series(True, index=parts.index)
+    for indicator in MOTHER_TONGUE_INDICATORS:
+        hit = unset & lowered.str.contains(indicator, regex=False)
+        lang = parts.loc[hit, 'part'].str.replace(PARENTHESES_PATTERN, '', regex=True).str.strip()
+        indicator_lang[hit] = lang.str.replace(indicator, '', regex=False).str.strip().map(clean_language_name)
+        unset &= ~hit
+    parts['indicator_lang'] = indicator_lang
+
+    # Language (and proficiency) at the start of the part
+    matched = parts['part'].str.extract('^' + LANGUAGE_PATTERN.pattern, flags=re.IGNORECASE)
+    parts['lang'] = matched[0].map(clean_language_name, na_action='ignore')
+    parts['prof'] = matched[1].fillna('').map(standardize_proficiency)
+    return parts
+
+def combine_language_parts(parts, count):
+    """Second half of parse_language_entry: walk each entry's parts in order to pick out the languages"""
+    mother_tongues = [None] * count
+    others = [[] for _ in range(count)]
+    for entry, indicator_lang, lang, prof in zip(parts['entry'], parts['indicator_lang'], parts['lang'], parts['prof']):
+        # pandas stores the missing values as NaN, so test for strings rather than None
+        if not mother_tongues[entry] and isinstance(indicator_lang, str):
+            mother_tongues[entry] = indicator_lang
+        if isinstance(lang, str) and lang:
+            if not mother_tongues[entry]:
+                mother_tongues[entry] = lang
+            if isinstance(prof, str):
+                others[entry].append(f"{lang} - {prof}")
+            elif lang != mother_tongues[entry]:
+                others[entry].append(lang)
+    return pd.DataFrame({
+        'Language Mother Tongue': mother_tongues,
+        'Other Languages': [', '.join(other) if other else None for other in others]
+    })
+
+def parse_language_entries(entries):
+    """parse_language_entry for a whole Series of distinct text entries, as two columns"""
+    entries = entries.reset_index(drop=True)
+    return combine_language_parts(split_language_parts(entries), len(entries))
+
+def parse_language_shards(entries, workers):
+    """Split the distinct entries across worker processes and stack their results in order"""
+    shard_size = -(-len(entries) // workers)
+    shards = [entries.iloc[i:i + shard_size] for i in range(0, len(entries), shard_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return pd.concat(list(executor.map(parse_language_entries, shards)), ignore_index=True)
+
+def process_language_data(input_file, mode='vectorized', workers=1):
     """Process language data from CSV"""
     df = pd.read_csv(input_file)
     
-    results = []
-    for column in df.columns:
-        for entry in df[column].dropna():
-            mother_tongue, other_languages = parse_language_entry(entry)
-            if mother_tongue:
-                results.append({
-                    'Language Mother Tongue': mother_tongue,
-                    'Other Languages': other_languages or ''
-                })
+    if mode == 'cells':
+        results = []
+        for column in df.columns:
+            for entry in df[column].dropna():
+                mother_tongue, other_languages = parse_language_entry(entry)
+                if mother_tongue:
+                    results.append({
+                        'Language Mother Tongue': mother_tongue,
+                        'Other Languages': other_languages or ''
+                    })
+        return results
+    
+    # Every cell as text, column by column, then each distinct entry parsed once
+    cells = pd.concat([df[column].dropna().astype(str) for column in df.columns], ignore_index=True)
+    if cells.empty:
+        return []
+    codes, uniques = pd.factorize(cells)
+    entries = pd.Series(uniques, dtype=object)
+    if workers > 1 and len(entries) > workers:
+        parsed = parse_language_shards(entries, workers)
+    else:
+        parsed = parse_language_entries(entries)
     
-    return results
+    # Broadcast the parsed pairs back to the cells, skipping entries without a mother tongue
+    pairs = [(mother_tongue, other_languages if isinstance(other_languages, str) else '')
+             if isinstance(mother_tongue, str) and mother_tongue else None
+             for mother_tongue, other_languages in zip(parsed['Language Mother Tongue'].tolist(),
+                                                       parsed['Other Languages'].tolist())]
+    return [{'Language Mother Tongue': pairs[code][0], 'Other Languages': pairs[code][1]}
+            for code in codes.tolist() if pairs[code] is not None]
 
 def save_to_csv(data, filename='cleaned_language_data_claude.csv'):
     """Save processed data to CSV"""
@@ -125,8 +224,21 @@ def save_to_csv(data, filename='cleaned_language_data_claude.csv'):
     
     print(f"Data saved to {filename}")
 
-# Process the data
-processed_data = process_language_data('assessor_languages.csv')
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pull mother tongue and other languages out of the assessor language sheet")
+    parser.add_argument('--input', default='assessor_languages.csv', help="Sheet with language entries in any of its columns")
+    parser.add_argument('--output', default='cleaned_language_data_claude.csv', help="CSV to write")
+    parser.add_argument('--mode', choices=PARSE_MODES, default='vectorized',
+                        help="Parse distinct entries column-wise with pandas string ops, or cell by cell")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Shard the distinct entries over this many processes (vectorized mode)")
+    args = parser.parse_args(argv)
+
+    # Process the data
+    processed_data = process_language_data(args.input, args.mode, args.workers)
+
+    # Save to CSV
+    save_to_csv(processed_data, args.output)
 
-# Save to CSV
-save_to_csv(processed_data)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
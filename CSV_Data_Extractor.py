@@ -0,0 +1,1034 @@
+import argparse
+import contextlib
+import csv
+from datetime import datetime
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import run_report
+from row_engine import (ENGINES, choose_engine, column_text, infer_column_text, is_missing, is_row_table, new_column_kind,
+                        read_csv_rows, scan_column)
+from run_report import count, log, stage
+
+ENCODING_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.encoding_cache.json')
+DETECTION_CHUNK_SIZE = 64 * 1024
+
+def load_encoding_cache():
+    try:
+        with open(ENCODING_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_encoding_cache(cache):
+    try:
+        with open(ENCODING_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        log(f"Warning: could not write encoding cache: {str(e)}", 'warnings')
+
+def encoding_cache_key(file_path):
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), f"{stat.st_size}|{stat.st_mtime_ns}"
+
+def lookup_cached_encoding(file_path):
+    """Return the cached encoding if the file still has the size and mtime it had when detected"""
+    path_key, stat_key = encoding_cache_key(file_path)
+    entry = load_encoding_cache().get(path_key, {})
+    if entry.get('stat') == stat_key:
+        return entry.get('encoding')
+    return None
+
+def remember_encoding(file_path, encoding):
+    cache = load_encoding_cache()
+    path_key, stat_key = encoding_cache_key(file_path)
+    cache[path_key] = {'stat': stat_key, 'encoding': encoding}
+    save_encoding_cache(cache)
+
+def read_raw_and_detect(file_path, detect=True, keep_data=True):
+    """Read the file once, feeding chunks to the detector only until it is confident"""
+    detector = None
+    if detect:
+        import chardet
+        detector = chardet.UniversalDetector()
+    chunks = []
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(DETECTION_CHUNK_SIZE), b''):
+            if keep_data:
+                chunks.append(chunk)
+            if detector is not None and not detector.done:
+                detector.feed(chunk)
+            elif not keep_data:
+                break
+    encoding = None
+    if detector is not None:
+        detector.close()
+        encoding = detector.result['encoding']
+    return b''.join(chunks), encoding
+
+def detect_encoding(file_path, encoding=None):
+    """Resolve the encoding without keeping the file contents: given, cached or detected"""
+    if encoding is not None:
+        return encoding, 'given'
+    encoding = lookup_cached_encoding(file_path)
+    if encoding is not None:
+        return encoding, 'cached'
+    _, encoding = read_raw_and_detect(file_path, keep_data=False)
+    encoding = encoding or 'utf-8'
+    remember_encoding(file_path, encoding)
+    return encoding, 'detected'
+
+def read_export_bytes(file_path, encoding=None):
+    """Read the file with its given, cached or detected encoding"""
+    with stage('encoding detection'):
+        source = 'given'
+        if encoding is None:
+            encoding = lookup_cached_encoding(file_path)
+            source = 'cached'
+
+        raw_data, detected = read_raw_and_detect(file_path, detect=encoding is None)
+        if encoding is None:
+            encoding = detected or 'utf-8'
+            source = 'detected'
+            remember_encoding(file_path, encoding)
+    return raw_data, encoding, source
+
+def count_header_columns(raw_data, encoding):
+    end = raw_data.find(b'\n')
+    first_line = raw_data[:end] if end >= 0 else raw_data
+    return len(next(csv.reader([first_line.decode(encoding, errors='replace').rstrip('\r')]), []))
+
+# Columns that repeat a handful of values down the whole export, loaded as pandas categoricals
+CATEGORY_COLUMNS = ("Stage Name", "Parent Company (if Applicable)", "Assessment Firm (if applicable)")
+
+def read_csv(file_path, encoding=None, columns=None):
+    """Load the export with pandas; columns, if given, limits it to those columns (see template_columns)"""
+    try:
+        import pandas as pd
+        raw_data, encoding, source = read_export_bytes(file_path, encoding)
+
+        # Hand pandas the bytes already read rather than reading the file again; it decodes them as it
+        # parses, so no decoded copy of the whole file is held alongside the frame
+        with stage('csv parse'):
+            usecols = (lambda col: col in columns) if columns is not None else None
+            df = pd.read_csv(io.BytesIO(raw_data), encoding=encoding, usecols=usecols,
+                             dtype={col: 'category' for col in CATEGORY_COLUMNS})
+        count('rows read', len(df))
+        log(f"Successfully read the file with {encoding} encoding ({source})", 'summary')
+        usage = df.memory_usage(deep=True)
+        frame_bytes = int(usage.sum())
+        count('frame bytes', frame_bytes)
+        total_columns = count_header_columns(raw_data, encoding)
+        message = f"Loaded {len(df.columns)} of {total_columns} columns: {frame_bytes / 1024 ** 2:.1f} MB in memory"
+        if 0 < len(df.columns) < total_columns:
+            # The skipped columns are assumed to be as large as the loaded ones on average; --all-columns measures it
+            column_bytes = (frame_bytes - int(usage['Index'])) / len(df.columns)
+            message += f", about {(usage['Index'] + column_bytes * total_columns) / 1024 ** 2:.1f} MB with every column"
+        log(message, 'summary')
+        return df
+    except Exception as e:
+        log(f"Error reading CSV file: {str(e)}", 'warnings')
+        return None
+
+def read_rows(file_path, encoding=None, columns=None):
+    """read_csv for the rows engine: the export as a table of header and row lists, read with the csv module"""
+    try:
+        raw_data, encoding, source = read_export_bytes(file_path, encoding)
+        total_columns = count_header_columns(raw_data, encoding)
+        with stage('csv parse'):
+            header, rows = read_csv_rows(file_path, text=raw_data.decode(encoding), columns=columns)
+            infer_column_text(header, rows, skip=CATEGORY_COLUMNS)
+            # The rows engine's categoricals: one string object per distinct value
+            for position, col in enumerate(header):
+                if col in CATEGORY_COLUMNS:
+                    shared = {}
+                    for row in rows:
+                        row[position] = shared.setdefault(row[position], row[position])
+        count('rows read', len(rows))
+        log(f"Successfully read the file with {encoding} encoding ({source})", 'summary')
+        log(f"Loaded {len(header)} of {total_columns} columns", 'summary')
+        return {'columns': header, 'rows': rows}
+    except Exception as e:
+        log(f"Error reading CSV file: {str(e)}", 'warnings')
+        return None
+
+def table_columns(df):
+    return list(df['columns']) if is_row_table(df) else list(df.columns)
+
+def frame_to_table(df, normalized):
+    """The frame and its normalized frames as row tuples, so projects are sliced from lists rather than DataFrames"""
+    values, valid = normalized
+    table = {'columns': list(df.columns), 'rows': list(df.itertuples(index=False, name=None))}
+    return table, (list(values.itertuples(index=False, name=None)), list(valid.itertuples(index=False, name=None)))
+
+def is_valid_date(date_string):
+    if is_missing(date_string):
+        return False
+    try:
+        datetime.strptime(str(date_string), '%Y-%m-%d')
+        return True
+    except ValueError:
+        return False
+
+DATE_FORMATS = ('%d-%b-%Y', '%d-%b-%y', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y')
+
+def strptime_dates(values):
+    """Parse each value with the first of DATE_FORMATS that matches, leaving out the ones that aren't dates"""
+    parsed = {}
+    for value in values:
+        for fmt in DATE_FORMATS:
+            try:
+                parsed[value] = datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+                break
+            except ValueError:
+                continue
+    return parsed
+
+def parse_unique_dates(values):
+    """Parse each distinct value once with one vectorized call per format, keeping the first format that matches"""
+    import pandas as pd
+    remaining = pd.Series(list(dict.fromkeys(values)), dtype=object)
+    parsed = {}
+    for fmt in DATE_FORMATS:
+        if remaining.empty:
+            break
+        converted = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        matched = converted.notna()
+        parsed.update(zip(remaining[matched], converted[matched].dt.strftime('%Y-%m-%d')))
+        remaining = remaining[~matched]
+
+    # Dates outside the pandas Timestamp range are left over, so give those one strptime pass
+    parsed.update(strptime_dates(remaining))
+    return parsed
+
+def normalize_dates(df):
+    """Convert every cell to its output string, returning the strings and a mask of the cells that parsed as dates"""
+    if is_row_table(df):
+        return normalize_row_dates(df)
+    import numpy as np
+    import pandas as pd
+    factorized = {}
+    date_candidates = set()
+    for col in df.columns:
+        codes, uniques = pd.factorize(df[col])
+        factorized[col] = (codes, uniques)
+        date_candidates.update(u for u in uniques if isinstance(u, str) and any(c.isdigit() for c in u))
+    parsed = parse_unique_dates(date_candidates)
+
+    values = {}
+    valid = {}
+    for col, (codes, uniques) in factorized.items():
+        # Missing cells have code -1, which picks the trailing '' / False
+        converted = np.array([parsed.get(u, str(u)) if isinstance(u, str) else str(u) for u in uniques] + [''], dtype=object)
+        is_date = np.array([isinstance(u, str) and u in parsed for u in uniques] + [False])
+        values[col] = converted[codes]
+        valid[col] = is_date[codes]
+    return pd.DataFrame(values, index=df.index), pd.DataFrame(valid, index=df.index)
+
+def normalize_row_dates(table):
+    """normalize_dates for the rows engine: lists of value and mask tuples, one per row"""
+    cells = {cell for row in table['rows'] for cell in row if cell is not None}
+    parsed = strptime_dates(cell for cell in cells if any(c.isdigit() for c in cell))
+    values = [tuple('' if cell is None else parsed.get(cell, cell) for cell in row) for row in table['rows']]
+    valid = [tuple(cell in parsed for cell in row) for row in table['rows']]
+    return values, valid
+
+def build_project_index(df):
+    """Map each Copper Mark number to the positions of its rows, in file order"""
+    if is_row_table(df):
+        position = df['columns'].index("Unique Copper Mark number")
+        index = {}
+        for row_number, row in enumerate(df['rows']):
+            if row[position] is not None:
+                index.setdefault(row[position], []).append(row_number)
+        return index
+    return df.groupby("Unique Copper Mark number", sort=False).indices
+
+def project_sort_key(project_id):
+    match = re.search(r'\d+', str(project_id))
+    return (int(match.group()) if match else float('inf'), str(project_id))
+
+def project_selected(project_id, start_id=None, end_id=None, project_ids=None):
+    if project_ids:
+        return project_id in project_ids
+    number = project_sort_key(project_id)[0]
+    if start_id is not None and number < start_id:
+        return False
+    if end_id is not None and number > end_id:
+        return False
+    return True
+
+def select_project_ids(project_index, start_id=None, end_id=None, project_ids=None):
+    """Pick the projects to export: an explicit list, an ID range, or everything in the data"""
+    if project_ids:
+        return list(dict.fromkeys(project_ids))  # an ID given twice is exported once
+    return [project_id for project_id in sorted(project_index, key=project_sort_key)
+            if project_selected(project_id, start_id, end_id)]
+
+def extract_project_data(df, project_id, project_index=None, normalized=None):
+    if is_row_table(df):
+        return extract_table_project(df, project_id, project_index, normalized)
+    if project_index is not None:
+        projects = df.iloc[project_index.get(project_id, [])]
+    else:
+        projects = df[df["Unique Copper Mark number"] == project_id]
+    if projects.empty:
+        log(f"No project found with ID {project_id}")
+        return []
+    
+    if normalized is None:
+        normalized = normalize_dates(projects)
+    values, valid = normalized
+    values = values.loc[projects.index]
+    valid = valid.loc[projects.index]
+    
+    # Rows are plain tuples in column order, which is what compile_export_plan indexes into
+    results = []
+    rows = zip(values.itertuples(index=False, name=None), valid.itertuples(index=False, name=None))
+    for row, (data, date_mask) in enumerate(rows):
+        site_name = projects["Site Name"].iloc[row] if "Site Name" in projects.columns else "Unknown Site"
+        parent_company = projects["Parent Company (if Applicable)"].iloc[row] if "Parent Company (if Applicable)" in projects.columns else "Unknown Parent"
+        results.append((data, site_name, parent_company, date_mask))
+    
+    return results
+
+def extract_table_project(table, project_id, project_index=None, normalized=None):
+    """extract_project_data for the rows engine"""
+    if project_index is None:
+        project_index = build_project_index(table)
+    positions = project_index.get(project_id, [])
+    if not len(positions):
+        log(f"No project found with ID {project_id}")
+        return []
+
+    rows = [table['rows'][p] for p in positions]
+    if normalized is None:
+        values, valid = normalize_row_dates({'columns': table['columns'], 'rows': rows})
+    else:
+        values, valid = [normalized[0][p] for p in positions], [normalized[1][p] for p in positions]
+    site = table['columns'].index("Site Name") if "Site Name" in table['columns'] else None
+    parent = table['columns'].index("Parent Company (if Applicable)") if "Parent Company (if Applicable)" in table['columns'] else None
+
+    results = []
+    for row, data, date_mask in zip(rows, values, valid):
+        site_name = row[site] if site is not None else "Unknown Site"
+        parent_company = row[parent] if parent is not None else "Unknown Parent"
+        results.append((data, site_name, parent_company, date_mask))
+    return results
+
+def determine_date_category(task_name):
+    received_tasks = [
+        'DD Checklist Reviewed',
+        'Completed Self-Assessment Received',
+        'Assessment plan received',
+        'Assessment start date',
+        'Assessment end date',
+        'Assessment report received',
+        'Improvement Plan received',
+        'Follow up assessment date',
+        'Follow up assessment report received'
+    ]
+    
+    if task_name in received_tasks:
+        return 'Date received'
+    
+    due_keywords = ['due', 'assessment', 'plan', 'declaration']
+    received_keywords = ['received', 'completed', 'issued', 'approved', 'start', 'end', 'date']
+    
+    task_lower = task_name.lower()
+    if any(keyword in task_lower for keyword in due_keywords):
+        return 'Due date'
+    elif any(keyword in task_lower for keyword in received_keywords):
+        return 'Date received'
+    else:
+        return 'Due date'  # Default to 'Due date' if unsure
+
+EXPORT_TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'export_template.json')
+
+def load_export_template(template_file=EXPORT_TEMPLATE_FILE):
+    """Load the stage/task layout of the export files from JSON, or YAML if PyYAML is installed"""
+    with open(template_file, 'r', encoding='utf-8') as f:
+        if template_file.lower().endswith(('.yml', '.yaml')):
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def template_columns(template):
+    """The export columns the template reads, plus the ones that identify and name a project"""
+    # The same columns compile_export_plan looks up; the rest of a wide export needn't be loaded
+    columns = ["Unique Copper Mark number", "Site Name", "Parent Company (if Applicable)"]
+    for stage in template['stages']:
+        for task in stage['tasks']:
+            name = task if isinstance(task, str) else task['name']
+            columns += [name, f"{name} Notes"]
+        columns += [task['column'] for task in stage.get('additional_tasks', [])]
+        columns.append(f"{stage['name']} Notes")
+    return set(columns)
+
+def compile_export_plan(template, columns):
+    """Flatten the template into (kind, column index, category, name, stage, note column index) steps"""
+    # Column lookups and date categories are resolved here once, so building a project's rows
+    # is a walk over the plan. Tasks whose column isn't in the export are left out.
+    # A repeated column name refers to its first copy, as it does in pandas
+    positions = {}
+    for idx, col in enumerate(columns):
+        positions.setdefault(col, idx)
+    plan = []
+    for stage in template['stages']:
+        stage_name = stage['name']
+        plan.append(('stage', -1, None, stage_name, stage_name, -1))
+        notes = []
+        
+        for task in stage['tasks']:
+            if isinstance(task, str):
+                task = {'name': task}
+            col = task['name']
+            if col not in positions:
+                continue
+            category = task.get('category') or determine_date_category(col)
+            note_column = positions.get(f"{col} Notes", -1)
+            plan.append(('date', positions[col], category, col, stage_name, note_column))
+            if note_column >= 0:
+                notes.append(('note', note_column, None, f"{col} Notes", stage_name, -1))
+        
+        for task in stage.get('additional_tasks', []):
+            if task.get('kind') == 'value':
+                plan.append(('value', positions.get(task['column'], -1), None, task['task'], stage_name, -1))
+            elif task['column'] in positions:
+                notes.append(('note', positions[task['column']], None, f"{task['task']} Notes", stage_name, -1))
+        
+        # Notes come after the stage's tasks, then any general notes for the stage
+        plan.extend(notes)
+        if f"{stage_name} Notes" in positions:
+            plan.append(('note', positions[f"{stage_name} Notes"], None, f"{stage_name} Notes", stage_name, -1))
+    return plan
+
+EXPORT_HEADER = ["Name", "Due date", "Date received & completed", "Notes", "Parent task"]
+VERIFY_MODES = ('none', 'sample', 'full')
+VERIFY_SAMPLE_PERCENT = 10
+
+DATE_POLICIES = ('keep', 'move-to-notes')
+
+def build_export_rows(data, plan, date_mask=None, policy='keep'):
+    """Lay out one project's row as the rows of its task import file, header first"""
+    # 'keep' writes every date cell to its date column as it is; 'move-to-notes' moves values
+    # that aren't valid dates to the Notes column and writes the task's note on its own row
+    rows = [list(EXPORT_HEADER)]
+    
+    for kind, column, category, name, stage, note_column in plan:
+        if kind == 'stage':
+            rows.append([name, "", "", "", ""])
+        elif kind == 'date':
+            date_value = data[column]
+            if policy == 'keep':
+                if category == 'Due date':
+                    rows.append([name, date_value, "", "", stage])
+                else:
+                    rows.append([name, "", date_value, "", stage])
+                continue
+            
+            note = data[note_column].strip() if note_column >= 0 else ""
+            
+            # Use the mask from normalize_dates when we have it rather than re-parsing
+            if date_mask is not None:
+                date_is_valid = date_mask[column]
+            else:
+                date_is_valid = is_valid_date(date_value)
+            
+            if date_is_valid:
+                if category == 'Due date':
+                    rows.append([name, date_value, "", note, stage])
+                else:
+                    rows.append([name, "", date_value, note, stage])
+            else:
+                # If the date is invalid, move it to notes
+                combined_note = f"{date_value} {note}".strip()
+                rows.append([name, "", "", combined_note, stage])
+        elif kind == 'value':
+            rows.append([name, "", "", data[column] if column >= 0 else "", stage])
+        else:
+            note = data[column].strip()
+            if note:
+                rows.append([name, "", "", note, stage])
+    
+    return rows
+
+def check_export_rows(rows, output_file):
+    """Schema check on the rows we are about to write, in place of reading the file back"""
+    if "Date received & completed" not in rows[0]:
+        log(f"Warning: 'Date received & completed' column is missing in {output_file}", 'warnings')
+    bad_rows = [number for number, row in enumerate(rows, start=1) if len(row) != len(rows[0])]
+    if bad_rows:
+        log(f"Warning: {len(bad_rows)} rows in {output_file} do not have {len(rows[0])} fields (first at row {bad_rows[0]})",
+            'warnings')
+
+def should_verify(output_file, verify):
+    if verify == 'full':
+        return True
+    if verify == 'sample':
+        # Pick files by name so the same sample is checked on every run
+        return zlib.crc32(os.path.basename(output_file).encode('utf-8')) % 100 < VERIFY_SAMPLE_PERCENT
+    return False
+
+def verify_export_file(output_file, rows):
+    """Re-parse a written file with the csv module and compare it to the rows we meant to write"""
+    with open(output_file, 'r', newline='', encoding='utf-8-sig') as f:
+        written = list(csv.reader(f))
+    if written != rows:
+        log(f"Warning: {output_file} does not match the rows that were written", 'warnings')
+    else:
+        log(f"Verified {len(written)} rows in {output_file}")
+
+OUTPUT_FORMATS = ('files', 'zip', 'long')
+BUNDLE_NAME = 'Extracted_projects'
+
+def open_bundle(output_dir, output_format):
+    """Open the single zip archive or long-format CSV that takes the place of the per-project files"""
+    if output_format == 'zip':
+        path = os.path.join(output_dir, f"{BUNDLE_NAME}.zip")
+        return {'format': 'zip', 'path': path, 'archive': zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)}
+    path = os.path.join(output_dir, f"{BUNDLE_NAME}.csv")
+    f = open(path, 'w', newline='', encoding='utf-8-sig')
+    writer = csv.writer(f, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+    writer.writerow(["Project key"] + EXPORT_HEADER)
+    return {'format': 'long', 'path': path, 'file': f, 'writer': writer}
+
+def write_to_bundle(bundle, file_name, rows):
+    """Add one project's rows to the bundle and return the name they were stored under"""
+    if bundle['format'] == 'zip':
+        # Written straight into the archive entry, no temp file
+        with bundle['archive'].open(file_name, 'w') as raw:
+            with io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as f:
+                csv.writer(f, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL).writerows(rows)
+        return file_name
+    # Long format: the header is written once, each row is keyed by the file name it would have had
+    project_key = os.path.splitext(file_name)[0]
+    bundle['writer'].writerows([project_key] + row for row in rows[1:])
+    return project_key
+
+def close_bundle(bundle):
+    if bundle['format'] == 'zip':
+        bundle['archive'].close()
+    else:
+        bundle['file'].close()
+    log(f"Bundled output saved to {bundle['path']}", 'summary')
+
+def write_export_file(rows, output_file, verify='none'):
+    """Write built rows to output_file and verify them if asked; the part of save_to_csv that waits on the disk"""
+    with stage('file write'):
+        with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+            writer.writerows(rows)
+    count('files written')
+    
+    log(f"Data saved to {output_file}")
+    
+    if should_verify(output_file, verify):
+        with stage('verification'):
+            verify_export_file(output_file, rows)
+
+def save_to_csv(data, output_file, plan, date_mask=None, verify='none', bundle=None, policy='keep'):
+    try:
+        rows = build_export_rows(data, plan, date_mask, policy)
+        check_export_rows(rows, output_file)
+        if bundle is not None:
+            with stage('file write'):
+                name = write_to_bundle(bundle, os.path.basename(output_file), rows)
+            count('files written')
+            log(f"Data added to {bundle['path']} as {name}")
+            return True
+        write_export_file(rows, output_file, verify)
+        return True
+        
+    except Exception as e:
+        log(f"Error saving CSV file {output_file}: {str(e)}", 'warnings')
+        return False
+
+MANIFEST_FILE_NAME = '.export_manifest.json'
+MANIFEST_SAVE_EVERY = 25
+ORPHAN_MODES = ('flag', 'delete')
+
+def load_manifest(output_dir, template_hash, policy='keep', force=False):
+    """Load the record of what is already in output_dir, so unchanged files aren't written again"""
+    manifest = {'files': {}, 'orphans': []}
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE_NAME), 'r', encoding='utf-8') as f:
+            manifest.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    # Run state, not saved: files produced by this run and writes since the last save
+    manifest.update({'output_dir': output_dir, 'template_hash': template_hash, 'policy': policy,
+                     'force': force, 'produced': set(), 'unsaved': 0})
+    return manifest
+
+def save_manifest(manifest):
+    """Write the manifest through a temp file so an interrupted run leaves the previous one intact"""
+    path = os.path.join(manifest['output_dir'], MANIFEST_FILE_NAME)
+    saved = {'template_hash': manifest['template_hash'], 'policy': manifest['policy'], 'files': manifest['files'],
+             'orphans': sorted(manifest['orphans'])}
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(saved, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+    manifest['unsaved'] = 0
+
+def template_hash(template):
+    """Hash of the whole template, so editing any task or category counts as a change without a version bump"""
+    payload = json.dumps(template, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def source_row_hash(data, template_hash, policy):
+    payload = json.dumps([template_hash, policy, list(data)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def skip_unchanged_jobs(jobs, project_id, manifest):
+    """Drop the jobs whose file is on disk and whose source row, template and policy haven't changed"""
+    if manifest is None:
+        return jobs
+    remaining = []
+    for job in jobs:
+        project_data, output_file = job[0], job[1]
+        name = os.path.basename(output_file)
+        row_hash = source_row_hash(project_data, manifest['template_hash'], manifest['policy'])
+        manifest['produced'].add(name)
+        entry = manifest['files'].get(name)
+        if not manifest['force'] and entry and entry['hash'] == row_hash and os.path.exists(output_file):
+            count('files unchanged')
+            log(f"Data for project {project_id} unchanged, kept {output_file}")
+            continue
+        manifest['files'][name] = {'project': project_id, 'hash': None, 'pending': row_hash}
+        remaining.append(job)
+    return remaining
+
+def record_written(manifest, written):
+    """Mark written files as current, saving every few files so a rerun can resume"""
+    if manifest is None:
+        return
+    for output_file in written:
+        entry = manifest['files'][os.path.basename(output_file)]
+        if 'pending' not in entry:
+            continue  # already recorded, e.g. the same file was queued twice
+        entry['hash'] = entry.pop('pending')
+        manifest['unsaved'] += 1
+    if manifest['unsaved'] >= MANIFEST_SAVE_EVERY:
+        save_manifest(manifest)
+
+def finish_manifest(manifest, orphans='flag', start_id=None, end_id=None, project_ids=None):
+    """Flag or delete files from earlier runs that this run no longer produces, then save"""
+    stale = set(manifest['orphans'])
+    for name, entry in list(manifest['files'].items()):
+        entry.pop('pending', None)
+        if name in manifest['produced']:
+            continue
+        # Projects outside the requested IDs weren't looked at, so their files aren't orphans
+        if project_selected(entry['project'], start_id, end_id, project_ids):
+            stale.add(name)
+            del manifest['files'][name]
+
+    manifest['orphans'] = []
+    for name in sorted(stale - manifest['produced']):
+        path = os.path.join(manifest['output_dir'], name)
+        if not os.path.exists(path):
+            continue
+        if orphans == 'delete':
+            os.remove(path)
+            log(f"Deleted orphaned file {path}", 'summary')
+        else:
+            log(f"Warning: {path} is no longer produced by the export (orphan)", 'warnings')
+            manifest['orphans'].append(name)
+    save_manifest(manifest)
+
+def create_filename(project_id, site_name, parent_company, duplicate_count):
+    site_name = site_name if not is_missing(site_name) else 'None'
+    parent_company = parent_company if not is_missing(parent_company) else 'None'
+    
+    filename = f"{project_id}_{site_name}_{parent_company}"
+    if duplicate_count > 0:
+        filename += f"_({duplicate_count + 1})"
+    filename = "".join(c if c.isalnum() or c in (' ', '_', '-') else '_' for c in filename).rstrip()
+    filename = filename.replace(' ', '_')
+    return f"{filename}.csv"
+
+def build_project_jobs(project_id, results, output_dir, plan, policy, first_idx=0):
+    """Work out the file name and console message for each file of one project in one output directory"""
+    jobs = []
+    for idx, (project_data, site_name, parent_company, date_mask) in enumerate(results, start=first_idx):
+        output_file = os.path.join(output_dir, create_filename(project_id, site_name, parent_company, idx))
+        message = f"Data for project {project_id}{' (reassessment)' if idx > 0 else ''} extracted and saved to {output_file}"
+        jobs.append((project_data, output_file, plan, date_mask, policy, message))
+    return jobs
+
+def export_project(jobs, verify='none', bundle=None):
+    written = []
+    for project_data, output_file, plan, date_mask, policy, message in jobs:
+        if save_to_csv(project_data, output_file, plan, date_mask, verify, bundle, policy):
+            written.append(output_file)
+        # save_to_csv already says where in the bundle the rows went
+        if bundle is None:
+            log(message)
+    return written
+
+def export_project_captured(jobs, verify='none', log_level='items'):
+    """Run export_project in a worker and return what it printed, so the parent can print it in order, and what it recorded"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), run_report.worker_run(log_level):
+        written = export_project(jobs, verify)
+        recorded = run_report.snapshot()
+    return output.getvalue(), written, recorded
+
+WRITER_QUEUE_SIZE = 32
+
+def start_writers(threads, queue_size=WRITER_QUEUE_SIZE):
+    """Start threads that write built project files off a bounded queue while the main thread builds the next ones"""
+    # 'pending' holds at most queue_size files of rows, so a slow disk makes the main thread wait
+    # instead of letting built rows pile up; 'finished' passes written files back for the manifest
+    writers = {'pending': queue.Queue(maxsize=queue_size), 'finished': queue.Queue(), 'error': None, 'threads': []}
+    for number in range(threads):
+        thread = threading.Thread(target=writer_loop, args=(writers,), name=f"export-writer-{number + 1}", daemon=True)
+        thread.start()
+        writers['threads'].append(thread)
+    return writers
+
+def writer_loop(writers):
+    while True:
+        item = writers['pending'].get()
+        if item is None:
+            return
+        target, output_file, rows, verify, message = item
+        if writers['error'] is not None:
+            continue  # Keep draining so the main thread is never left blocked on a full queue
+        try:
+            write_export_file(rows, output_file, verify)
+            log(message)
+            writers['finished'].put((target, output_file))
+        except (OSError, ValueError, csv.Error) as e:
+            # Like save_to_csv: the file is reported and left out of the manifest, so the next run writes it again
+            log(f"Error saving CSV file {output_file}: {str(e)}", 'warnings')
+        except BaseException as e:
+            writers['error'] = e
+
+def raise_writer_error(writers):
+    if writers['error'] is not None:
+        raise RuntimeError(f"Writing the project files failed: {writers['error']!r}") from writers['error']
+
+def queue_project_files(writers, target, jobs, verify='none'):
+    """Build each job's rows here and queue them for the writer threads, waiting while the queue is full"""
+    for project_data, output_file, plan, date_mask, policy, message in jobs:
+        try:
+            rows = build_export_rows(project_data, plan, date_mask, policy)
+            check_export_rows(rows, output_file)
+        except Exception as e:
+            log(f"Error saving CSV file {output_file}: {str(e)}", 'warnings')
+            continue
+        raise_writer_error(writers)
+        writers['pending'].put((target, output_file, rows, verify, message))
+
+def record_finished(writers):
+    """Mark the files the writer threads have finished so far as written in their manifests"""
+    finished = {}
+    while True:
+        try:
+            target, output_file = writers['finished'].get_nowait()
+        except queue.Empty:
+            break
+        finished.setdefault(id(target), (target, []))[1].append(output_file)
+    for target, written in finished.values():
+        record_written(target['manifest'], written)
+
+def stop_writers(writers):
+    """Let the writer threads finish everything queued, record it, then raise any error they hit"""
+    for _ in writers['threads']:
+        writers['pending'].put(None)
+    for thread in writers['threads']:
+        thread.join()
+    record_finished(writers)
+    raise_writer_error(writers)
+
+def plan_project_exports(df, project_id, project_index, normalized, targets, plan, file_counts=None):
+    """Extract one project's rows once and list the jobs still to do for every target"""
+    results = extract_project_data(df, project_id, project_index, normalized)
+    if not results:
+        log(f"No data extracted for project {project_id}")
+        return []
+    # file_counts remembers how many files a project already has, so a project whose
+    # rows arrive over several chunks keeps numbering its reassessments
+    first_idx = file_counts.get(project_id, 0) if file_counts is not None else 0
+    if file_counts is not None:
+        file_counts[project_id] = first_idx + len(results)
+    target_jobs = []
+    for target in targets:
+        jobs = build_project_jobs(project_id, results, target['output_dir'], plan, target['policy'], first_idx)
+        target_jobs.append((target, skip_unchanged_jobs(jobs, project_id, target['manifest'])))
+    return target_jobs
+
+def count_failed_dates(normalized, plan, positions):
+    """Count the non-blank cells of the template's date columns that aren't dates, in the rows at positions"""
+    values, valid = normalized
+    date_columns = sorted({column for kind, column, *_ in plan if kind == 'date'})
+    if date_columns and isinstance(values, list):
+        count('dates failed to parse', sum(1 for position in positions for column in date_columns
+                                           if values[position][column] != '' and not valid[position][column]))
+    elif date_columns:
+        values, valid = values.iloc[positions, date_columns], valid.iloc[positions, date_columns]
+        failed = (values != '').to_numpy() & ~valid.to_numpy()
+        count('dates failed to parse', failed.sum())
+
+def export_projects(df, project_ids, project_index, targets, plan, executor=None, verify='none', file_counts=None,
+                    writers=None):
+    """Write the selected projects of one frame to every target; dates are normalized once for all of them"""
+    with stage('date normalization'):
+        normalized = normalize_dates(df)
+        if not is_row_table(df):
+            # Slicing a wide frame once per project costs more than the whole export takes otherwise
+            df, normalized = frame_to_table(df, normalized)
+    # Only the exported projects' rows, so a run limited with --ids reports on those projects alone
+    count_failed_dates(normalized, plan, [position for project_id in project_ids for position in project_index.get(project_id, ())])
+    if executor is None:
+        for project_id in project_ids:
+            for target, jobs in plan_project_exports(df, project_id, project_index, normalized, targets, plan, file_counts):
+                if writers is not None and target['bundle'] is None:
+                    queue_project_files(writers, target, jobs, verify)
+                else:
+                    record_written(target['manifest'], export_project(jobs, verify, target['bundle']))
+            if writers is not None:
+                record_finished(writers)
+        return
+
+    # File names are decided here so reassessment suffixes don't depend on worker timing,
+    # and each worker is only sent the rows of its own project
+    batches = []
+    for project_id in project_ids:
+        messages = io.StringIO()
+        with contextlib.redirect_stdout(messages):
+            target_jobs = plan_project_exports(df, project_id, project_index, normalized, targets, plan, file_counts)
+        futures = [(target, executor.submit(export_project_captured, jobs, verify, run_report.current_run['log_level']))
+                   for target, jobs in target_jobs if jobs]
+        batches.append((messages.getvalue(), futures))
+
+    for messages, futures in batches:
+        print(messages, end='')
+        for target, future in futures:
+            output, written, recorded = future.result()
+            print(output, end='')
+            run_report.merge(recorded)
+            record_written(target['manifest'], written)
+
+def open_targets(targets, template, incremental=True, force=False, output_format='files'):
+    """Set up each (policy, output directory) pair with its bundle or manifest"""
+    opened = []
+    for policy, output_dir in targets:
+        os.makedirs(output_dir, exist_ok=True)
+        # A bundle is rewritten as a whole by this process, so it has no manifest
+        bundle = open_bundle(output_dir, output_format) if output_format != 'files' else None
+        manifest = None
+        if incremental and bundle is None:
+            manifest = load_manifest(output_dir, template_hash(template), policy, force)
+        opened.append({'policy': policy, 'output_dir': output_dir, 'bundle': bundle, 'manifest': manifest})
+    return opened
+
+def close_targets(targets, completed, orphans='flag', start_id=None, end_id=None, project_ids=None):
+    """Close bundles and save manifests; orphans are only settled once a run has finished"""
+    for target in targets:
+        if target['bundle'] is not None:
+            close_bundle(target['bundle'])
+        if target['manifest'] is not None:
+            if completed:
+                finish_manifest(target['manifest'], orphans, start_id, end_id, project_ids)
+            else:
+                save_manifest(target['manifest'])
+
+def process_batch(df, targets, start_id=None, end_id=None, project_ids=None, workers=1, verify='none', template=None,
+                  incremental=True, force=False, orphans='flag', output_format='files', writer_threads=1):
+    """Export the selected projects of a loaded export to every (policy, output directory) target"""
+    template = template or load_export_template()
+    plan = compile_export_plan(template, table_columns(df))
+    targets = open_targets(targets, template, incremental, force, output_format)
+    with stage('index build'):
+        project_index = build_project_index(df)
+    selected_ids = select_project_ids(project_index, start_id, end_id, project_ids)
+    completed = False
+    try:
+        if workers <= 1 or output_format != 'files':
+            writers = start_writers(writer_threads) if writer_threads > 0 and output_format == 'files' else None
+            try:
+                export_projects(df, selected_ids, project_index, targets, plan, verify=verify, writers=writers)
+            finally:
+                # Queued files are written and recorded even when the run is interrupted
+                if writers is not None:
+                    stop_writers(writers)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                export_projects(df, selected_ids, project_index, targets, plan, executor, verify)
+        completed = True
+    finally:
+        # An interrupted run still saves its manifests so the next run resumes from there
+        close_targets(targets, completed, orphans, start_id, end_id, project_ids)
+    # IDs asked for that aren't in the export were reported as not found and don't count as processed
+    return [project_id for project_id in selected_ids if project_id in project_index]
+
+def scan_stream_columns(file_path, encoding, chunksize, usecols):
+    """First pass of process_stream: how to rewrite each column's text, decided over the whole file as read_rows does"""
+    import pandas as pd
+    kinds = {}
+    for chunk in pd.read_csv(file_path, encoding=encoding, chunksize=chunksize, dtype=str, usecols=usecols):
+        for col in chunk.columns:
+            if col not in CATEGORY_COLUMNS:
+                scan_column(kinds.setdefault(col, new_column_kind()), chunk[col].dropna().tolist(), len(chunk))
+    converters = {}
+    for col, kind in kinds.items():
+        convert = column_text(kind)
+        if convert is not None:
+            converters[col] = convert
+    return converters
+
+def process_stream(file_path, targets, chunksize, encoding=None, start_id=None, end_id=None, project_ids=None, workers=1, verify='none',
+                   template=None, incremental=True, force=False, orphans='flag', output_format='files', writer_threads=1,
+                   columns=None):
+    """Export projects chunk by chunk as their rows are read, so memory doesn't grow with the file; columns limits what is read"""
+    with stage('encoding detection'):
+        encoding, source = detect_encoding(file_path, encoding)
+    log(f"Streaming the file with {encoding} encoding ({source}) in chunks of {chunksize} rows", 'summary')
+    template = template or load_export_template()
+    plan = None
+    targets = open_targets(targets, template, incremental, force, output_format)
+    file_counts = {}
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and output_format == 'files' else None
+    writers = start_writers(writer_threads) if executor is None and writer_threads > 0 and output_format == 'files' else None
+    completed = False
+    try:
+        import pandas as pd
+        # Every chunk is read as text so a column can't change type between chunks, then typed by
+        # what the whole file holds, so numbers and true/false are written as a batch run writes them
+        usecols = (lambda col: col in columns) if columns is not None else None
+        with stage('column scan'):
+            converters = scan_stream_columns(file_path, encoding, chunksize, usecols)
+        reader = pd.read_csv(file_path, encoding=encoding, chunksize=chunksize, dtype=str, usecols=usecols)
+        for chunk in run_report.timed_iter('csv parse', reader):
+            count('rows read', len(chunk))
+            for col, convert in converters.items():
+                chunk[col] = chunk[col].map(convert, na_action='ignore')
+            if plan is None:
+                plan = compile_export_plan(template, list(chunk.columns))
+            with stage('index build'):
+                project_index = build_project_index(chunk)
+            chunk_ids = [project_id for project_id in select_project_ids(project_index, start_id, end_id, project_ids)
+                         if project_id in project_index]
+            export_projects(chunk, chunk_ids, project_index, targets, plan, executor, verify, file_counts, writers)
+        completed = True
+    finally:
+        try:
+            if executor is not None:
+                executor.shutdown()
+            if writers is not None:
+                stop_writers(writers)
+        finally:
+            close_targets(targets, completed, orphans, start_id, end_id, project_ids)
+
+    for project_id in dict.fromkeys(project_ids or []):
+        if project_id not in file_counts:
+            log(f"No data extracted for project {project_id}")
+    return sorted(file_counts, key=project_sort_key)
+
+DEFAULT_INPUT = r"C:\Users\tomlo\OneDrive\Documents\Personal\Work\The Copper Mark\Participants CSV- APM.csv"
+DEFAULT_TARGETS = [
+    ('keep', r"C:\Users\tomlo\OneDrive\Documents\Personal\Work\The Copper Mark\Extracted_1600"),
+    ('move-to-notes', r"C:\Users\tomlo\OneDrive\Documents\Personal\Work\The Copper Mark\Extracted_1007"),
+]
+
+def parse_target(value):
+    policy, sep, output_dir = value.partition('=')
+    if not sep or policy not in DATE_POLICIES or not output_dir:
+        raise argparse.ArgumentTypeError(f"expected POLICY=DIR with POLICY one of {', '.join(DATE_POLICIES)}, got '{value}'")
+    return policy, output_dir
+
+def parse_args(argv=None, default_policy=None, default_output_dir=None):
+    parser = argparse.ArgumentParser(description="Extract per-project task CSVs from the Participants export")
+    parser.add_argument('--input', default=DEFAULT_INPUT, help="Participants CSV export")
+    parser.add_argument('--target', action='append', type=parse_target, metavar='POLICY=DIR',
+                        help="Write files with this date policy into DIR; repeat to fan one parse out to several outputs")
+    parser.add_argument('--policy', choices=DATE_POLICIES, default=default_policy,
+                        help="Date policy for --output-dir: keep bad dates in place, or move them to the Notes column")
+    parser.add_argument('--output-dir', default=default_output_dir,
+                        help="Directory for the per-project CSV files (with --policy)")
+    parser.add_argument('--encoding', default=None, help="Skip detection and read the export with this encoding, e.g. utf-8")
+    parser.add_argument('--start-id', type=int, default=None, help="Only export projects numbered from this ID, e.g. 1 for P0001")
+    parser.add_argument('--end-id', type=int, default=None, help="Only export projects numbered up to this ID, e.g. 117 for P0117")
+    parser.add_argument('--ids', nargs='+', default=None, help="Only export these projects, e.g. P0001 P0042")
+    parser.add_argument('--workers', type=int, default=1, help="Write project files with this many worker processes")
+    parser.add_argument('--writer-threads', type=int, default=1,
+                        help="Threads writing project files while the next ones are built; 0 writes each file in turn")
+    parser.add_argument('--template', default=EXPORT_TEMPLATE_FILE,
+                        help="JSON (or YAML) file describing the stages and tasks of the export files")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Stream the export in chunks of this many rows instead of loading it whole")
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='files',
+                        help="One CSV per project (default), a single zip of them, or one long-format CSV keyed by project")
+    parser.add_argument('--force', action='store_true',
+                        help="Rewrite every file even if the manifest says it is unchanged")
+    parser.add_argument('--no-manifest', action='store_true',
+                        help="Don't read or write the manifest in the output directory")
+    parser.add_argument('--orphans', choices=ORPHAN_MODES, default='flag',
+                        help="What to do with files from earlier runs that are no longer produced")
+    parser.add_argument('--verify', choices=VERIFY_MODES, default='none',
+                        help="Re-read written files with the csv module: all of them, a fixed sample, or none")
+    parser.add_argument('--all-columns', action='store_true',
+                        help="Load every column of the export, not only the ones the template reads, e.g. to measure the "
+                             "memory a run without pruning takes rather than the estimate logged")
+    parser.add_argument('--engine', choices=ENGINES, default='pandas',
+                        help="Read the export with pandas, or with the csv module (rows), which starts faster; "
+                             "auto picks rows for small files")
+    parser.add_argument('--log-level', choices=run_report.LOG_LEVELS, default='items',
+                        help="Print every file written (items), only the summary, or only warnings")
+    parser.add_argument('--report', default=run_report.REPORT_FILE,
+                        help="JSON file for the run report (stage timings and counters)")
+    parser.add_argument('--no-report', action='store_true', help="Don't write the run report")
+    args = parser.parse_args(argv)
+
+    if args.target:
+        args.targets = args.target
+    elif args.output_dir:
+        if args.policy is None:
+            parser.error("--output-dir needs --policy")
+        args.targets = [(args.policy, args.output_dir)]
+    else:
+        args.targets = DEFAULT_TARGETS
+    if args.chunksize and args.engine == 'rows':
+        parser.error("--chunksize streams the export with pandas and can't be used with --engine rows")
+    return args
+
+def main(argv=None, default_policy=None, default_output_dir=None):
+    args = parse_args(argv, default_policy, default_output_dir)
+    run_report.start_run('CSV_Data_Extractor', args.log_level)
+    template = load_export_template(args.template)
+    columns = None if args.all_columns else template_columns(template)
+    
+    if args.chunksize:
+        processed = process_stream(args.input, args.targets, args.chunksize, args.encoding,
+                                   args.start_id, args.end_id, args.ids, args.workers, args.verify, template,
+                                   not args.no_manifest, args.force, args.orphans, args.output_format, args.writer_threads,
+                                   columns)
+        log(f"Batch processing completed for {len(processed)} projects", 'summary')
+    else:
+        engine = choose_engine(args.engine, args.input)
+        log(f"Using the {engine} engine", 'summary')
+        if engine == 'rows':
+            df = read_rows(args.input, args.encoding, columns)
+        else:
+            df = read_csv(args.input, encoding=args.encoding, columns=columns)
+        if df is None:
+            log("Failed to read the CSV file. Please check the file path and try again.", 'warnings')
+            return
+        processed = process_batch(df, args.targets, args.start_id, args.end_id, args.ids, args.workers, args.verify, template,
+                                  not args.no_manifest, args.force, args.orphans, args.output_format, args.writer_threads)
+        log(f"Batch processing completed for {len(processed)} projects", 'summary')
+    count('projects processed', len(processed))
+    run_report.finish_run(None if args.no_report else args.report)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,43 +1,130 @@
-import pandas as pd
+import argparse
+from assessor_names import FUZZY_THRESHOLD, find_probable_matches
+from frame_cache import read_csv_cached
+from row_engine import ENGINES, choose_engine, read_column, write_csv_rows
 
-# Read the CSV files
-df_assessors = pd.read_csv('TSM_Assessor_List_New.csv')
-df_verifiers = pd.read_csv('TSM_Verifier_List_CSV.csv')
+DEFAULT_LISTS = [
+    ('Assessors', 'TSM_Assessor_List_New.csv'),
+    ('Verifiers', 'TSM_Verifier_List_CSV.csv'),
+]
+MEMBERSHIP_OUTPUT = 'Flagged Names_Mar25_membership.csv'
+CLASSIC_OUTPUT = 'Flagged Names_Mar25.csv'
+FUZZY_OUTPUT = 'Flagged Names_Mar25_fuzzy.csv'
+VIEWS = ('tidy', 'classic', 'both')
 
-# Extract the 'Full Name' column from each file and remove any missing values
-assessors_names = set(df_assessors['Full Name'].dropna().unique())
-verifiers_names = set(df_verifiers['Full Name'].dropna().unique())
+def parse_list(value):
+    label, sep, file_path = value.partition('=')
+    if not sep or not label or not file_path:
+        raise argparse.ArgumentTypeError(f"expected LABEL=FILE, got '{value}'")
+    return label, file_path
 
-# Compute the three groups:
-# 1. Names present in both files.
-contacts_to_merge = sorted(list(assessors_names & verifiers_names))
+def read_names(file_path, name_column='Full Name', engine='pandas'):
+    """The distinct non-missing names of one list, in file order"""
+    if engine == 'rows':
+        return list(dict.fromkeys(read_column(file_path, name_column)))
+    df = read_csv_cached(file_path)
+    # Extract the name column and remove any missing values
+    return df[name_column].dropna().unique()
 
-# 2. Names in CM_TSM_Assessors_clean.csv but not in TSM_Verifier_List_CSV.csv.
-not_fully_approved = sorted(list(assessors_names - verifiers_names))
+def build_membership(lists, name_column='Full Name', engine='pandas'):
+    """One bitmap per unique name, with bit i set when the name appears in list i"""
+    membership = {}
+    for bit, (label, file_path) in enumerate(lists):
+        for name in read_names(file_path, name_column, engine):
+            membership[name] = membership.get(name, 0) | (1 << bit)
+    return membership
 
-# 3. Names in TSM_Verifier_List_CSV.csv but not in CM_TSM_Assessors_clean.csv.
-to_chase_up = sorted(list(verifiers_names - assessors_names))
+# Each view is a header and a list of rows, written with the csv module the way DataFrame.to_csv writes them
+def membership_table(membership, labels):
+    """Tidy view: one row per name and a Yes/No column per list"""
+    rows = []
+    for name in sorted(membership):
+        flags = ['Yes' if membership[name] >> bit & 1 else 'No' for bit in range(len(labels))]
+        rows.append([name] + flags + [bin(membership[name]).count('1')])
+    return ['Full Name'] + list(labels) + ['Lists'], rows
 
-# Determine the maximum length among the lists so we can create a uniform DataFrame
-max_length = max(len(contacts_to_merge), len(not_fully_approved), len(to_chase_up))
+def split_first_two(membership):
+    """Names in both of the first two lists, only in the first, and only in the second"""
+    both, first_only, second_only = [], [], []
+    for name in sorted(membership):
+        bits = membership[name] & 0b11
+        if bits == 0b11:
+            both.append(name)
+        elif bits == 0b01:
+            first_only.append(name)
+        elif bits == 0b10:
+            second_only.append(name)
+    return both, first_only, second_only
 
 # Define a helper function to pad lists with empty strings to match the maximum length
 def pad_list(name_list, length):
     return name_list + [''] * (length - len(name_list))
 
-# Pad each list to the maximum length
-contacts_to_merge = pad_list(contacts_to_merge, max_length)
-not_fully_approved = pad_list(not_fully_approved, max_length)
-to_chase_up = pad_list(to_chase_up, max_length)
+def classic_view(membership):
+    """The original three padded columns comparing the assessor and verifier lists"""
+    contacts_to_merge, not_fully_approved, to_chase_up = split_first_two(membership)
 
-# Create a DataFrame with the flagged columns
-output_df = pd.DataFrame({
-    'Contacts to merge': contacts_to_merge,
-    'Not fully approved': not_fully_approved,
-    'To chase up': to_chase_up
-})
+    # Determine the maximum length among the lists so we can create uniform columns
+    max_length = max(len(contacts_to_merge), len(not_fully_approved), len(to_chase_up))
 
-# Write the DataFrame to a CSV file
-output_df.to_csv('Flagged Names_Mar25.csv', index=False)
+    # Lay the flagged columns out side by side
+    columns = [pad_list(names, max_length) for names in (contacts_to_merge, not_fully_approved, to_chase_up)]
+    return ['Contacts to merge', 'Not fully approved', 'To chase up'], [list(row) for row in zip(*columns)]
 
-print("Output written to 'Flagged Names_Mar25.csv'")
+def fuzzy_view(membership, threshold):
+    """Pairs of names, one only in the first list and one only in the second, that are probably the same person"""
+    _, first_only, second_only = split_first_two(membership)
+    matches = find_probable_matches(first_only, second_only, threshold=threshold)
+    rows = [[m['left'], m['right'], m['score'], 'Yes' if m['probable'] else 'No']
+            for m in sorted(matches, key=lambda m: -m['score'])]
+    probable_count = sum(1 for m in matches if m['probable'])
+    print(f"Fuzzy matching found {probable_count} probable same-person pairs ({len(matches)} candidates)")
+    return ['Not fully approved', 'To chase up', 'Match score', 'Probable same person'], rows
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Flag names that differ between contact lists")
+    parser.add_argument('--list', action='append', type=parse_list, metavar='LABEL=FILE',
+                        help="A contact list to reconcile; repeat for each list (default: the assessor and verifier lists)")
+    parser.add_argument('--name-column', default='Full Name', help="Column holding the names in every list")
+    parser.add_argument('--view', choices=VIEWS, default=None,
+                        help="Tidy membership table, the classic three columns for the first two lists, or both "
+                             "(default: both for the assessor and verifier lists, tidy otherwise)")
+    parser.add_argument('--fuzzy', action='store_true',
+                        help="Also pair up names only in the first list with names only in the second that are "
+                             "probably the same person (spelling, accents, order, middle names)")
+    parser.add_argument('--threshold', type=float, default=FUZZY_THRESHOLD,
+                        help="Score from 0 to 1 at which a fuzzy pair counts as the same person")
+    parser.add_argument('--engine', choices=ENGINES, default='auto',
+                        help="Read the lists with pandas (and the frame cache), or with the csv module (rows), "
+                             "which starts faster; auto picks rows for small lists")
+    args = parser.parse_args(argv)
+
+    args.lists = args.list or DEFAULT_LISTS
+    if len(args.lists) < 2:
+        parser.error("give at least two lists")
+    if len({label for label, _ in args.lists}) < len(args.lists):
+        parser.error("list labels must be unique")
+    if args.view is None:
+        args.view = 'both' if args.list is None else 'tidy'
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    engine = choose_engine(args.engine, *(file_path for _, file_path in args.lists))
+    membership = build_membership(args.lists, args.name_column, engine)
+
+    if args.view in ('tidy', 'both'):
+        write_csv_rows(MEMBERSHIP_OUTPUT, *membership_table(membership, [label for label, _ in args.lists]))
+        print(f"Membership of {len(membership)} names in {len(args.lists)} lists written to '{MEMBERSHIP_OUTPUT}'")
+
+    # Pair up names that only differ in spelling, accents, word order or middle names
+    if args.fuzzy:
+        write_csv_rows(FUZZY_OUTPUT, *fuzzy_view(membership, args.threshold))
+        print(f"Fuzzy matches written to '{FUZZY_OUTPUT}'")
+
+    if args.view in ('classic', 'both'):
+        write_csv_rows(CLASSIC_OUTPUT, *classic_view(membership))
+        print(f"Output written to '{CLASSIC_OUTPUT}'")
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,114 @@
-import pandas as pd
+import argparse
+import os
+from collections import Counter
 from datetime import datetime
+from functools import lru_cache
+import pandas as pd
 
-# Read the CSV file (assumes the CSV has a header; if not, use header=None)
-df = pd.read_csv('assessor_dates.csv')
-
-# Get the name of the only column
-date_column = df.columns[0]
+INPUT_FILE = 'assessor_dates.csv'
+CHUNKSIZE = 50000
+# Tried in order; the first is the 'DD-MMM-YY' (e.g. '29-SEP-21') format of the assessor export
+DATE_FORMATS = ('%d-%b-%y', '%d-%b-%Y', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y')
+# Share of a column's non-blank values that must parse for it to be detected as a date column
+DETECT_SHARE = 0.8
+# Values that could not be converted are shown up to this many, however many there are
+MAX_EXAMPLES = 5
 
+@lru_cache(maxsize=None)
 def convert_date(date_str):
     """
-    Convert a date from 'DD-MMM-YY' (e.g., '29-SEP-21') to 'YYYY-MM-DD'
-    (e.g., '2021-09-29'). If the cell is blank, return an empty string.
+    Convert a date in any of DATE_FORMATS to 'YYYY-MM-DD' (e.g., '2021-09-29').
+    If the cell is blank, return an empty string; if it isn't a date, return None.
     """
-    # Check if the cell is blank or NaN.
-    if pd.isna(date_str) or str(date_str).strip() == '':
+    date_str = date_str.strip()
+    if date_str == '':
         return ''  # Leave the cell blank.
-    
-    # Parse the original date string.
-    date_obj = datetime.strptime(date_str, '%d-%b-%y')
-    
-    # Format the date to 'YYYY-MM-DD'
-    return date_obj.strftime('%Y-%m-%d')
-
-# Apply the conversion to the entire column.
-df[date_column] = df[date_column].apply(convert_date)
-
-# Write the updated DataFrame back to the same CSV file.
-df.to_csv('assessor_dates.csv', index=False, na_rep='')
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+def detect_date_columns(df):
+    """Columns where most of the non-blank values are dates"""
+    columns = []
+    for col in df.columns:
+        values = [value for value in df[col].unique() if value.strip()]
+        parsed = sum(1 for value in values if convert_date(value) is not None)
+        if values and parsed >= DETECT_SHARE * len(values):
+            columns.append(col)
+    return columns
+
+def convert_column(values, failures, examples):
+    """Convert each distinct value once; values that aren't dates are counted and left unchanged"""
+    converted = {}
+    failed = []
+    for value in values.unique():
+        result = convert_date(value)
+        if result is None:
+            failed.append(value)
+            if len(examples) < MAX_EXAMPLES:
+                examples.setdefault(value, None)
+            result = value
+        converted[value] = result
+    if failed:
+        failures[values.name] += int(values.isin(failed).sum())
+    return values.map(converted)
+
+def convert_file(input_file, output_file=None, columns=None, chunksize=CHUNKSIZE):
+    """Convert the date columns chunk by chunk into a temp file, then swap it in for output_file"""
+    output_file = output_file or input_file
+    temp_file = output_file + '.tmp'
+    failures = Counter()
+    examples = {}
+    written = False
+
+    try:
+        # Every column is read as text, so the columns that aren't converted are written back as they were
+        for i, chunk in enumerate(pd.read_csv(input_file, dtype=str, keep_default_na=False, chunksize=chunksize)):
+            if i == 0:
+                if columns is None:
+                    columns = detect_date_columns(chunk)
+                    print(f"Detected date columns in the first {len(chunk)} rows: {', '.join(columns) if columns else 'none'}")
+                missing = [col for col in columns if col not in chunk.columns]
+                if missing:
+                    print(f"Error: column(s) not found in {input_file}: {', '.join(missing)}")
+                    return None
+                for col in columns:
+                    failures[col] = 0
+
+            for col in columns:
+                chunk[col] = convert_column(chunk[col], failures, examples)
+            chunk.to_csv(temp_file, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+            written = True
+
+        if written:
+            os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    for col, count in failures.items():
+        print(f"{col}: {count} values could not be converted and were left unchanged")
+    if examples:
+        print(f"Examples: {', '.join(repr(value) for value in examples)}")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert date columns to YYYY-MM-DD")
+    parser.add_argument('--input', default=INPUT_FILE, help="CSV with the dates to convert")
+    parser.add_argument('--output', default=None, help="CSV to write (default: replace the input once it's done)")
+    parser.add_argument('--columns', nargs='+', default=None,
+                        help="Date columns to convert (default: detect the columns where most values in the first "
+                             "chunk of rows are dates; raise --chunksize to sample more rows)")
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE, help="Rows to read and write at a time")
+    args = parser.parse_args(argv)
+
+    failures = convert_file(args.input, args.output, args.columns, args.chunksize)
+    if failures is not None:
+        print(f"Dates written to {args.output or args.input}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+from collections import Counter
+import json
+import os
+import sys
+from assessor_names import join_on_name
+from frame_cache import read_csv_cached
+from row_engine import ENGINES, choose_engine, infer_column_text, is_missing, is_row_table, read_csv_rows, write_csv_rows
+import run_report
+from run_report import count, log, stage
+
+TSM_FILE = 'TSM_Assessor_Details.csv'
+MASTER_FILE = 'All_Assessors_JF.csv'
+EDUCATION_OUTPUT = 'All_Assessors_Education.csv'
+EXPERTISE_OUTPUT = 'All_Assessors_Expertise.csv'
+
+# Define the expertise columns we're interested in
+EXPERTISE_COLS = ['1. Environmental', '2. Social', '4. Supply Chain Due Diligence']
+
+CATEGORY_MAPPING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'category_mapping.json')
+CATEGORY_OUTPUT = 'TSM_Assessor_Details_mapped.csv'
+
+def education_output(joined, tsm_assessors, settings):
+    """Write each TSM assessor's education from All_Assessors_JF.csv and print the summary"""
+    import pandas as pd
+    results = []
+    missing_count = 0
+    no_education_count = 0
+
+    # Process each assessor in original order
+    for name, education, merge in zip(joined['Full Name'], joined['Education'], joined['_merge']):
+        if merge == 'left_only':
+            log(f"Assessor not found in {MASTER_FILE}: {name}")
+            results.append({'Full Name': name, 'Education': 'Not Found'})
+            missing_count += 1
+        else:
+            if pd.isna(education) or str(education).strip() == "":
+                log(f"No education information found for assessor: {name}")
+                results.append({'Full Name': name, 'Education': 'Not Available'})
+                no_education_count += 1
+            else:
+                results.append({'Full Name': name, 'Education': education})
+
+    # Create DataFrame from results and save to CSV
+    output_df = pd.DataFrame(results)
+    output_df.to_csv(EDUCATION_OUTPUT, index=False)
+
+    # Print summary
+    total_assessors = len(tsm_assessors)
+    log(f"\nProcessing complete:", 'summary')
+    log(f"Total assessors processed: {total_assessors}", 'summary')
+    log(f"Assessors with education info: {total_assessors - missing_count - no_education_count}", 'summary')
+    log(f"Assessors not found: {missing_count}", 'summary')
+    log(f"Assessors with no education info: {no_education_count}", 'summary')
+    log(f"Output saved to {EDUCATION_OUTPUT}", 'summary')
+
+def expertise_output(joined, tsm_assessors, settings):
+    """Write the YES/SI expertise areas of each TSM assessor and print the statistics"""
+    import pandas as pd
+    stats = {col: {'YES': 0, 'NO': 0} for col in EXPERTISE_COLS}
+    not_yes_assessors = set()
+    results = []
+
+    # Process each assessor in original order
+    for _, assessor_row in joined.iterrows():
+        name = assessor_row['Full Name']
+
+        if assessor_row['_merge'] == 'left_only':
+            log(f"Assessor not found in {MASTER_FILE}: {name}")
+            results.append({'Full Name': name, 'Expertise': 'Not Found'})
+            continue
+
+        # Get expertise for this assessor
+        assessor_expertise = []
+        has_no_expertise = True
+
+        for col in EXPERTISE_COLS:
+            value = str(assessor_row[col]).strip().upper() if not pd.isna(assessor_row[col]) else 'NO'
+
+            if value in ['YES', 'SI']:
+                assessor_expertise.append(col)
+                stats[col]['YES'] += 1
+                has_no_expertise = False
+            else:
+                stats[col]['NO'] += 1
+                if value not in ['NO', '']:
+                    log(f"Non-standard value '{value}' found for {name} in {col}")
+
+            if has_no_expertise:
+                not_yes_assessors.add(name)
+
+        # Format expertise output
+        expertise_output = '\n'.join(assessor_expertise) if assessor_expertise else 'None'
+        results.append({'Full Name': name, 'Expertise': expertise_output})
+
+    # Create DataFrame and save to CSV
+    output_df = pd.DataFrame(results)
+    output_df.to_csv(EXPERTISE_OUTPUT, index=False)
+
+    # Print detailed summary
+    log("\nProcessing complete:", 'summary')
+    log(f"Total assessors processed: {len(tsm_assessors)}", 'summary')
+    log(f"Assessors not found: {sum(1 for r in results if r['Expertise'] == 'Not Found')}", 'summary')
+    log("\nExpertise Statistics:", 'summary')
+    for col in EXPERTISE_COLS:
+        log(f"{col}:", 'summary')
+        log(f"  YES: {stats[col]['YES']}", 'summary')
+        log(f"  NO/Blank/Other: {stats[col]['NO']}", 'summary')
+    log(f"\nAssessors with no expertise (all NO/blank): {len(not_yes_assessors)}", 'summary')
+    if not_yes_assessors:
+        log("Assessors with no expertise:")
+        for name in sorted(not_yes_assessors):
+            log(f"  {name}")
+    log(f"\nOutput saved to {EXPERTISE_OUTPUT}", 'summary')
+
+def load_category_mapping(mapping_file=CATEGORY_MAPPING_FILE):
+    """Load the mapping from initial categories to Salesflare categories"""
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        return json.load(f)['categories']
+
+def compile_category_mapping(mapping):
+    """Number the Salesflare categories and map each initial category to a tuple of their IDs"""
+    names = []
+    ids = {}
+    compiled = {}
+    for category, targets in mapping.items():
+        for target in targets:
+            if target not in ids:
+                ids[target] = len(names)
+                names.append(target)
+        compiled[category] = tuple(ids[target] for target in targets)
+    return names, compiled
+
+def map_expertise(expertise_str, names, compiled, unknown):
+    """Map expertise categories to Salesflare categories, handling semicolon separation."""
+    # Handle empty or NaN inputs
+    if is_missing(expertise_str) or not expertise_str.strip():
+        return ""
+    # Split by semicolon and strip whitespace, filtering out empty strings
+    categories = [cat.strip() for cat in expertise_str.split(";") if cat.strip()]
+    mapped_ids = []
+    # Map each category to Salesflare category IDs, collecting the ones we don't know
+    for cat in categories:
+        if cat in compiled:
+            mapped_ids.extend(compiled[cat])
+        else:
+            unknown.append(cat)
+    # Remove duplicates while preserving order
+    return "; ".join(names[i] for i in dict.fromkeys(mapped_ids))
+
+def map_expertise_values(value_counts, mapping):
+    """Work each distinct expertise string out once; returns {value: mapped} and the unknown category counts"""
+    names, compiled = compile_category_mapping(mapping)
+    unknown_counts = Counter()
+    mapped = {}
+    for value, count in value_counts:
+        unknown = []
+        mapped[value] = map_expertise(value, names, compiled, unknown)
+        for cat in unknown:
+            unknown_counts[cat] += count
+    return mapped, unknown_counts
+
+def map_expertise_column(expertise, mapping):
+    """Map every row of a Series; returns the column and unknown counts"""
+    mapped, unknown_counts = map_expertise_values(expertise.value_counts().items(), mapping)
+    return expertise.map(mapped).fillna(""), unknown_counts
+
+def map_expertise_rows(table, mapping):
+    """map_expertise_column for a rows engine table: adds or replaces its 'Expertise_mapped' column"""
+    position = table['columns'].index("Expertise")
+    values = Counter(row[position] for row in table['rows'] if row[position] is not None)
+    mapped, unknown_counts = map_expertise_values(values.most_common(), mapping)
+    if "Expertise_mapped" not in table['columns']:
+        table['columns'].append("Expertise_mapped")
+        for row in table['rows']:
+            row.append(None)
+    target = table['columns'].index("Expertise_mapped")
+    for row in table['rows']:
+        row[target] = mapped.get(row[position], "")
+    return unknown_counts
+
+def category_output(joined, tsm_assessors, settings):
+    """Write TSM_Assessor_Details.csv with the Salesflare 'Expertise_mapped' column to a new file"""
+    mapping = load_category_mapping(settings['mapping_file'])
+    if is_row_table(tsm_assessors):
+        unknown_counts = map_expertise_rows(tsm_assessors, mapping)
+    else:
+        tsm_assessors["Expertise_mapped"], unknown_counts = map_expertise_column(tsm_assessors["Expertise"], mapping)
+
+    if unknown_counts:
+        log(f"Warning: {len(unknown_counts)} unknown categories not mapped:", 'warnings')
+        for cat, rows in unknown_counts.most_common():
+            log(f"  '{cat}': {rows} rows", 'warnings')
+
+    # Write through a temp file so an interrupted run can't leave a half-written CSV
+    output_file = settings['category_output']
+    if is_row_table(tsm_assessors):
+        write_csv_rows(output_file + '.tmp', tsm_assessors['columns'], tsm_assessors['rows'])
+    else:
+        tsm_assessors.to_csv(output_file + '.tmp', index=False)
+    os.replace(output_file + '.tmp', output_file)
+    log(f"{output_file} has been written with the 'Expertise_mapped' column.", 'summary')
+
+# Each producer: the All_Assessors_JF.csv columns it needs (None if it only uses the TSM file) and its function
+PRODUCERS = {
+    'education': (['Education'], education_output),
+    'expertise': (EXPERTISE_COLS, expertise_output),
+    'category': (None, category_output),
+}
+
+def read_rows_table(file_path):
+    """The TSM file as a rows engine table, for runs that don't need the pandas name join"""
+    with stage('csv parse'):
+        header, rows = read_csv_rows(file_path)
+        infer_column_text(header, rows)
+    count('rows read', len(rows))
+    return {'columns': header, 'rows': rows}
+
+def run_enrichment(outputs, mapping_file=CATEGORY_MAPPING_FILE, category_output_file=CATEGORY_OUTPUT, engine='auto'):
+    """Load the assessor files once, join once, and run the requested producers in order; False if an input is missing"""
+    needed = [col for name in outputs for col in (PRODUCERS[name][0] or [])]
+    # The name join is done with pandas; the rows engine only serves runs that map categories
+    engine = 'pandas' if needed else choose_engine(engine, TSM_FILE)
+    try:
+        tsm_assessors = read_rows_table(TSM_FILE) if engine == 'rows' else read_csv_cached(TSM_FILE)
+        all_assessors = read_csv_cached(MASTER_FILE) if needed else None
+    except FileNotFoundError as e:
+        log(f"Error: Could not find one of the input files - {e}", 'warnings')
+        return False
+
+    settings = {'mapping_file': mapping_file, 'category_output': category_output_file}
+    joined = None
+    if needed:
+        with stage('name join'):
+            joined = join_on_name(tsm_assessors, all_assessors, list(dict.fromkeys(needed)), MASTER_FILE)
+        count('unmatched names', (joined['_merge'] == 'left_only').sum())
+
+    for i, name in enumerate(outputs):
+        if i:
+            log('', 'summary')
+        with stage(name):
+            PRODUCERS[name][1](joined, tsm_assessors, settings)
+    return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enrich the TSM assessor list from one load and join of the source files")
+    parser.add_argument('--outputs', nargs='+', choices=list(PRODUCERS), default=list(PRODUCERS),
+                        help="Outputs to produce, in this order (default: all of them)")
+    parser.add_argument('--mapping', default=CATEGORY_MAPPING_FILE,
+                        help="JSON file mapping initial expertise categories to Salesflare categories")
+    parser.add_argument('--category-output', default=CATEGORY_OUTPUT,
+                        help="CSV to write the TSM assessor details with the 'Expertise_mapped' column to")
+    parser.add_argument('--engine', choices=ENGINES, default='auto',
+                        help="Read the TSM file with pandas, or with the csv module (rows), which starts faster; "
+                             "rows only covers --outputs category, and auto picks it for small files")
+    parser.add_argument('--log-level', choices=run_report.LOG_LEVELS, default='items',
+                        help="Print a line per assessor (items), only the summaries, or only warnings")
+    parser.add_argument('--report', default=run_report.REPORT_FILE,
+                        help="JSON file for the run report (stage timings and counters)")
+    parser.add_argument('--no-report', action='store_true', help="Don't write the run report")
+    args = parser.parse_args(argv)
+    if args.engine == 'rows' and any(PRODUCERS[name][0] for name in args.outputs):
+        parser.error("--engine rows only covers --outputs category; the name join needs pandas")
+
+    run_report.start_run('assessor_enrichment', args.log_level)
+    completed = run_enrichment(list(dict.fromkeys(args.outputs)), args.mapping, args.category_output, args.engine)
+    run_report.finish_run(None if args.no_report else args.report)
+    if not completed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from row_engine import is_missing
+from run_report import log
+
+def normalize_name(name):
+    """Fold case, accents and whitespace so 'José  Pérez' and 'jose perez' compare equal"""
+    if is_missing(name):
+        return ''
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().split())
+
+def join_on_name(left, right, columns, right_label):
+    """Left-join columns of right onto left by normalized 'Full Name', keeping left's rows and order"""
+    # Names that appear more than once in right are reported and the first row is used.
+    # The '_merge' column says whether each left row was found ('both') or not ('left_only').
+    import pandas as pd
+    left_keys = left['Full Name'].map(normalize_name)
+    master = right[columns].assign(_name_key=right['Full Name'].map(normalize_name))
+    master = master[master['_name_key'] != '']
+
+    counts = master['_name_key'].value_counts()
+    duplicates = counts[counts > 1]
+    reported = list(dict.fromkeys(left_keys[left_keys.isin(duplicates.index)]))
+    # One pass over the duplicated rows gathers every reported key's names, rather than a scan per key
+    duplicated = master[master['_name_key'].isin(reported)]
+    names_by_key = right.loc[duplicated.index, 'Full Name'].groupby(duplicated['_name_key'], sort=False).agg(list)
+    for key in reported:
+        names = names_by_key[key]
+        log(f"Warning: {len(names)} rows in {right_label} match '{key}' ({'; '.join(map(str, names))}), using the first",
+            'warnings')
+
+    master = master.drop_duplicates('_name_key')
+    joined = pd.DataFrame({'Full Name': left['Full Name'].to_numpy(), '_name_key': left_keys.to_numpy()})
+    joined = joined.merge(master, on='_name_key', how='left', indicator=True)
+    return joined.drop(columns='_name_key')
+
+FUZZY_THRESHOLD = 0.85
+FUZZY_MIN_SCORE = 0.6
+# Each name is blocked on about this many of its rarest trigrams, shared out over its words: rare ones say the
+# most about who is who, and skipping the common ones keeps blocking from going quadratic as the lists grow
+BLOCK_RARE_TRIGRAMS = 8
+BLOCK_MAX_CANDIDATES = 10
+
+def name_tokens(name):
+    """Normalized name split into words, with punctuation such as hyphens and dots treated as spaces"""
+    text = re.sub(r"[^\w\s]", ' ', normalize_name(name))
+    return tuple(text.split())
+
+def name_trigrams(tokens):
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def sorted_name(tokens):
+    return ' '.join(sorted(tokens))
+
+def name_similarity(tokens_a, tokens_b, matcher=None, floor=0.0):
+    """Score two tokenized names from 0 to 1, ignoring word order and tolerating a missing middle name"""
+    # Scores that cannot beat floor are not worked out exactly; the result is then floor or below
+    if not tokens_a or not tokens_b:
+        return 0.0
+    if sorted(tokens_a) == sorted(tokens_b):
+        return 1.0
+    score = 0.0
+    shorter, longer = sorted((set(tokens_a), set(tokens_b)), key=len)
+    if len(shorter) >= 2 and shorter <= longer:
+        score = 0.9
+    if matcher is None:
+        matcher = SequenceMatcher(None, '', sorted_name(tokens_b))
+    matcher.set_seq1(sorted_name(tokens_a))
+    floor = max(floor, score)
+    if matcher.real_quick_ratio() > floor and matcher.quick_ratio() > floor:
+        score = max(score, matcher.ratio())
+    return score
+
+def find_probable_matches(left_names, right_names, threshold=FUZZY_THRESHOLD, min_score=FUZZY_MIN_SCORE):
+    """Best right-hand candidate for each left name, found through a trigram index rather than all pairs"""
+    right_tokens = {name: name_tokens(name) for name in right_names}
+    # Names with the same words once normalized (case, accents, spacing, order) are paired without scoring
+    exact = {}
+    index = {}
+    for name, tokens in right_tokens.items():
+        if tokens:
+            exact.setdefault(sorted_name(tokens), name)
+        for gram in name_trigrams(tokens):
+            index.setdefault(gram, []).append(name)
+
+    matches = []
+    for left in left_names:
+        tokens = name_tokens(left)
+        if tokens and sorted_name(tokens) in exact:
+            matches.append({'left': left, 'right': exact[sorted_name(tokens)], 'score': 1.0, 'probable': True})
+            continue
+
+        # The rarest trigrams of every word, so a typo in one word still leaves the others to find the name;
+        # ties are broken by the trigram so runs are repeatable
+        per_word = max(2, -(-BLOCK_RARE_TRIGRAMS // len(tokens))) if tokens else 0
+        grams = set()
+        for token in tokens:
+            ranked = sorted((len(index[gram]), gram) for gram in name_trigrams((token,)) if gram in index)
+            grams.update(gram for _, gram in ranked[:per_word])
+        shared = Counter()
+        for gram in sorted(grams):
+            shared.update(index[gram])
+
+        # Only score the few candidates sharing the most trigrams, and only if they share a fair part of them
+        needed = max(1, len(grams) // 3)
+        matcher = SequenceMatcher(None, '', sorted_name(tokens))
+        best_name, best_score = None, 0.0
+        for name, count in shared.most_common(BLOCK_MAX_CANDIDATES):
+            if count < needed:
+                break
+            score = name_similarity(right_tokens[name], tokens, matcher, floor=max(best_score, min_score))
+            if score > best_score or (score == best_score and best_name is not None and name < best_name):
+                best_name, best_score = name, score
+
+        if best_name is not None and best_score >= min_score:
+            matches.append({'left': left, 'right': best_name, 'score': round(best_score, 3),
+                            'probable': best_score >= threshold})
+    return matches
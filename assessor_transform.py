@@ -0,0 +1,85 @@
+import argparse
+import pandas as pd
+
+INPUT_FILE = 'Assessor list 2025 - partially approved.csv'
+OUTPUT_FILE = 'assessor_details_v2.csv'
+EXPERTISE_FORMATS = ('labels', 'bitmask')
+
+# Define the expertise columns that contain 'X'.
+# In bitmask output, bit i of the Expertise value stands for EXPERTISE_COLUMNS[i].
+EXPERTISE_COLUMNS = [
+    'Environmental management systems',
+    'Occupational health and safety management systems',
+    'Labor, industrial relations, and human resources management systems',
+    'Social impact assessments and human rights due diligence',
+    'Community relations and stakeholder engagement;',
+    'Compliance and ethics',
+    'Mineral supply chain due diligence',
+    'Sustainability reporting',
+    'Experience with local communities'
+]
+
+def expertise_mask(df):
+    """Bitmask of the expertise columns marked with 'X' (case-insensitive) in each row"""
+    mask = pd.Series(0, index=df.index, dtype='int64')
+    for bit, col in enumerate(EXPERTISE_COLUMNS):
+        marked = df[col].astype(str).str.strip().str.lower().eq('x')
+        mask += marked.astype('int64') * (1 << bit)
+    return mask
+
+def decode_expertise_mask(mask):
+    """Turn a bitmask back into the '; '-joined expertise labels"""
+    return '; '.join(col for bit, col in enumerate(EXPERTISE_COLUMNS) if int(mask) >> bit & 1)
+
+def expertise_labels(mask):
+    # At most 2**9 distinct masks, so each label string is only built once
+    labels = {value: decode_expertise_mask(value) for value in mask.unique()}
+    return mask.map(labels)
+
+def transform_assessors(df, expertise_format='labels'):
+    """Collapse the X columns into one Expertise column and add the upload columns"""
+    # 1) Create a new column "Expertise" with extracted expertise from the X columns
+    mask = expertise_mask(df)
+    df['Expertise'] = mask if expertise_format == 'bitmask' else expertise_labels(mask)
+
+    # 2) Drop the original expertise columns
+    df_cleaned = df.drop(columns=EXPERTISE_COLUMNS)
+
+    # 3) Rename the "Name" column to "Full name" (only if "Name" exists in your CSV)
+    df_cleaned.rename(columns={'Name': 'Full name'}, inplace=True)
+
+    # 4) Create a column "Stakeholder Type" set to "Assessor" for all rows
+    df_cleaned['Stakeholder Type'] = 'Assessor'
+
+    # 5) Create another column "Country of Residence"
+    #    You can leave it blank or populate it with existing data if available
+    df_cleaned['Country of Residence'] = ''
+    return df_cleaned
+
+def transform_file(input_file, output_file, expertise_format='labels', chunksize=None):
+    if not chunksize:
+        df = pd.read_csv(input_file)
+        transform_assessors(df, expertise_format).to_csv(output_file, index=False)
+        return
+
+    # Streaming keeps every column as text, so numbers are written as they appear in the input
+    for i, chunk in enumerate(pd.read_csv(input_file, chunksize=chunksize, dtype=str)):
+        transform_assessors(chunk, expertise_format).to_csv(output_file, index=False,
+                                                            mode='w' if i == 0 else 'a', header=i == 0)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reshape the partially approved assessor list for upload")
+    parser.add_argument('--input', default=INPUT_FILE, help="Assessor list with one X column per expertise")
+    parser.add_argument('--output', default=OUTPUT_FILE, help="CSV to write")
+    parser.add_argument('--expertise-format', choices=EXPERTISE_FORMATS, default='labels',
+                        help="Write Expertise as '; '-joined labels, or as an integer bitmask over the expertise columns")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Read and write the list in chunks of this many rows instead of loading it whole")
+    args = parser.parse_args(argv)
+
+    transform_file(args.input, args.output, args.expertise_format, args.chunksize)
+
+    print(f"Process complete. Output saved to '{args.output}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Runs the scripts that take --engine with pandas and with the csv module (rows) on the same synthetic inputs,
+# and checks that both engines write the same files byte for byte.
+import argparse
+import contextlib
+import filecmp
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import CSV_Data_Extractor
+import Flagging_names
+import assessor_enrichment
+import frame_cache
+from synthetic_data import generate_all
+
+ENGINES = ('pandas', 'rows')
+# Written by the runs but not part of what they produce
+IGNORED = {'.encoding_cache.json', '.frame_cache', '.export_manifest.json', 'run_report.json'}
+# What the runs must write, so a script that fails for both engines doesn't pass as a match
+EXPECTED_OUTPUTS = ['keep', 'moved', Flagging_names.MEMBERSHIP_OUTPUT, assessor_enrichment.CATEGORY_OUTPUT]
+
+def run_scripts(directory, engine):
+    """Run each script with engine in directory, which holds a copy of the inputs"""
+    CSV_Data_Extractor.ENCODING_CACHE_FILE = os.path.join(directory, '.encoding_cache.json')
+    frame_cache.FRAME_CACHE_DIR = os.path.join(directory, '.frame_cache')
+    cwd = os.getcwd()
+    # The scripts read and write their files relative to the working directory
+    os.chdir(directory)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            CSV_Data_Extractor.main(['--input', 'Participants.csv', '--target', 'keep=keep', '--target', 'move-to-notes=moved',
+                                     '--engine', engine, '--no-manifest', '--no-report'])
+            Flagging_names.main(['--view', 'both', '--engine', engine])
+            assessor_enrichment.main(['--outputs', 'category', '--engine', engine, '--no-report'])
+    finally:
+        os.chdir(cwd)
+
+def compare_dirs(left, right, path=''):
+    """Relative paths of the files that differ between left and right, or are only in one of them"""
+    comparison = filecmp.dircmp(left, right, ignore=list(IGNORED))
+    differ = [os.path.join(path, name) for name in comparison.left_only + comparison.right_only + comparison.funny_files]
+    # dircmp compares by size and date; the files are read to be sure they match byte for byte
+    _, mismatch, errors = filecmp.cmpfiles(left, right, comparison.common_files, shallow=False)
+    differ += [os.path.join(path, name) for name in mismatch + errors]
+    for name in comparison.common_dirs:
+        differ += compare_dirs(os.path.join(left, name), os.path.join(right, name), os.path.join(path, name))
+    return sorted(differ)
+
+def check_scale(scale, seed, keep_data=False):
+    """Files the two engines wrote differently for the inputs of one scale"""
+    workdir = tempfile.mkdtemp(prefix=f"cm_parity_{scale}x_")
+    try:
+        inputs = os.path.join(workdir, 'inputs')
+        generate_all(inputs, scale, seed)
+        missing = []
+        for engine in ENGINES:
+            shutil.copytree(inputs, os.path.join(workdir, engine))
+            run_scripts(os.path.join(workdir, engine), engine)
+            missing += [f"{name} (not written with {engine})" for name in EXPECTED_OUTPUTS
+                        if not os.path.exists(os.path.join(workdir, engine, name))]
+        return missing + compare_dirs(*(os.path.join(workdir, engine) for engine in ENGINES))
+    finally:
+        if keep_data:
+            print(f"Inputs and outputs kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that --engine pandas and --engine rows write the same files")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1], help="Multipliers of the base input sizes")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic data")
+    parser.add_argument('--keep-data', action='store_true', help="Leave the generated inputs and outputs in place")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for scale in args.scales:
+        scale = int(scale) if float(scale).is_integer() else scale
+        differ = check_scale(scale, args.seed, args.keep_data)
+        print(f"{scale}x: " + (f"{len(differ)} files differ: {', '.join(differ)}" if differ else "the engines wrote the same files"))
+        failed = failed or bool(differ)
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# Times the main steps of the scripts on synthetic inputs at several scales and records the results as JSON.
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+
+# Imported here, as the scripts only import them when needed, so no benchmark pays for the import.
+# chardet also loads its models on first use, which is done once here for the same reason.
+import chardet
+chardet.detect('Participant,Notes\nP0001,café\n'.encode('cp1252'))
+import pandas as pd
+import Assessor_Languages_Claude
+import CSV_Data_Extractor
+import Flagging_names
+import assessor_dates
+import assessor_enrichment
+import assessor_transform
+import frame_cache
+from synthetic_data import generate_all
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_OUTPUT = 'benchmark_results.json'
+
+def template_columns():
+    # The columns the extractor loads by default
+    return CSV_Data_Extractor.template_columns(CSV_Data_Extractor.load_export_template())
+
+def bench_read_participants(workdir):
+    CSV_Data_Extractor.read_csv(os.path.join(workdir, 'Participants.csv'), columns=template_columns())
+
+def bench_read_participants_rows(workdir):
+    CSV_Data_Extractor.read_rows(os.path.join(workdir, 'Participants.csv'), columns=template_columns())
+
+def bench_process_batch(workdir, engine='pandas'):
+    read = CSV_Data_Extractor.read_rows if engine == 'rows' else CSV_Data_Extractor.read_csv
+    df = read(os.path.join(workdir, 'Participants.csv'), columns=template_columns())
+    output_dir = os.path.join(workdir, 'extracted')
+    shutil.rmtree(output_dir, ignore_errors=True)
+    start = time.perf_counter()
+    CSV_Data_Extractor.process_batch(df, [('keep', output_dir)], incremental=False)
+    return time.perf_counter() - start
+
+def bench_process_batch_rows(workdir):
+    return bench_process_batch(workdir, 'rows')
+
+def bench_enrichment_joins(workdir):
+    assessor_enrichment.run_enrichment(['education', 'expertise'])
+
+def bench_flagging_names(workdir):
+    Flagging_names.main(['--view', 'both', '--engine', 'pandas'])
+
+def bench_flagging_names_rows(workdir):
+    Flagging_names.main(['--view', 'both', '--engine', 'rows'])
+
+def fuzzy_recall(workdir, probable_only=False):
+    """Share of the planted same-person pairs that the fuzzy view paired up"""
+    lists = {}
+    for label, file_path in Flagging_names.DEFAULT_LISTS:
+        with open(os.path.join(workdir, file_path), 'r', newline='', encoding='utf-8') as f:
+            lists[label] = {row['Full Name'] for row in csv.DictReader(f)}
+    # A pair can only be found if each name is on its own list alone, which random name collisions can undo
+    with open(os.path.join(workdir, 'planted_name_pairs.csv'), 'r', newline='', encoding='utf-8') as f:
+        planted = {(row['Assessor'], row['Verifier']) for row in csv.DictReader(f)
+                   if row['Assessor'] not in lists['Verifiers'] and row['Verifier'] not in lists['Assessors']}
+    with open(os.path.join(workdir, Flagging_names.FUZZY_OUTPUT), 'r', newline='', encoding='utf-8') as f:
+        found = {(row['Not fully approved'], row['To chase up']) for row in csv.DictReader(f)
+                 if not probable_only or row['Probable same person'] == 'Yes'}
+    return round(len(planted & found) / len(planted), 4) if planted else None
+
+def bench_flagging_names_fuzzy(workdir):
+    start = time.perf_counter()
+    Flagging_names.main(['--view', 'tidy', '--fuzzy', '--engine', 'pandas'])
+    seconds = time.perf_counter() - start
+    return {'seconds': seconds, 'recall': fuzzy_recall(workdir), 'probable_recall': fuzzy_recall(workdir, True)}
+
+def bench_map_expertise(workdir):
+    details = pd.read_csv(os.path.join(workdir, 'TSM_Assessor_Details.csv'))
+    mapping = assessor_enrichment.load_category_mapping()
+    start = time.perf_counter()
+    assessor_enrichment.map_expertise_column(details['Expertise'], mapping)
+    return time.perf_counter() - start
+
+def bench_map_expertise_rows(workdir):
+    table = assessor_enrichment.read_rows_table(os.path.join(workdir, 'TSM_Assessor_Details.csv'))
+    mapping = assessor_enrichment.load_category_mapping()
+    start = time.perf_counter()
+    assessor_enrichment.map_expertise_rows(table, mapping)
+    return time.perf_counter() - start
+
+def bench_process_language_data(workdir):
+    Assessor_Languages_Claude.parse_language_entry.cache_clear()
+    Assessor_Languages_Claude.clean_language_name.cache_clear()
+    Assessor_Languages_Claude.process_language_data(os.path.join(workdir, 'assessor_languages.csv'))
+
+def bench_assessor_dates(workdir):
+    assessor_dates.convert_date.cache_clear()
+    # Written to another file, so the next run converts the same input
+    assessor_dates.convert_file(assessor_dates.INPUT_FILE, 'assessor_dates_converted.csv')
+
+def bench_csv_transformation(workdir):
+    assessor_transform.transform_file(assessor_transform.INPUT_FILE, assessor_transform.OUTPUT_FILE)
+
+# A benchmark returns the seconds of the part it measures, or None to time the whole call, or a dict of
+# 'seconds' (either of those) and other measurements to record, such as recall.
+# The _rows variants run the same step on the csv module engine, to compare against --engine auto's threshold.
+BENCHMARKS = {
+    'read_participants': bench_read_participants,
+    'read_participants_rows': bench_read_participants_rows,
+    'process_batch': bench_process_batch,
+    'process_batch_rows': bench_process_batch_rows,
+    'enrichment_joins': bench_enrichment_joins,
+    'flagging_names': bench_flagging_names,
+    'flagging_names_rows': bench_flagging_names_rows,
+    'flagging_names_fuzzy': bench_flagging_names_fuzzy,
+    'map_expertise': bench_map_expertise,
+    'map_expertise_rows': bench_map_expertise_rows,
+    'process_language_data': bench_process_language_data,
+    'assessor_dates': bench_assessor_dates,
+    'csv_transformation': bench_csv_transformation,
+}
+
+def clear_caches():
+    """Delete the encoding and frame caches, so no run gains from what an earlier one detected or parsed"""
+    if os.path.exists(CSV_Data_Extractor.ENCODING_CACHE_FILE):
+        os.remove(CSV_Data_Extractor.ENCODING_CACHE_FILE)
+    shutil.rmtree(frame_cache.FRAME_CACHE_DIR, ignore_errors=True)
+
+def run_benchmark(function, workdir, repeat):
+    """Seconds for each of repeat runs and the other measurements of the last one, with the scripts' console output swallowed"""
+    # Every run starts with cold caches: otherwise whichever benchmark reads Participants.csv first pays for
+    # detecting its encoding and the rest don't, and the pandas and rows variants stop being comparable
+    seconds = []
+    measurements = {}
+    for _ in range(repeat):
+        clear_caches()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            measured = function(workdir)
+            elapsed = time.perf_counter() - start
+        if isinstance(measured, dict):
+            measurements = dict(measured)
+            measured = measurements.pop('seconds', None)
+        seconds.append(round(measured if measured is not None else elapsed, 4))
+    return seconds, measurements
+
+def run_scale(scale, seed, names, repeat, keep_data=False):
+    workdir = tempfile.mkdtemp(prefix=f"cm_bench_{scale}x_")
+    cwd = os.getcwd()
+    # The caches live next to the scripts; point them at the scratch directory, where run_benchmark clears them
+    CSV_Data_Extractor.ENCODING_CACHE_FILE = os.path.join(workdir, '.encoding_cache.json')
+    frame_cache.FRAME_CACHE_DIR = os.path.join(workdir, '.frame_cache')
+    try:
+        sizes = generate_all(workdir, scale, seed)
+        # The scripts read and write their files relative to the working directory
+        os.chdir(workdir)
+        results = []
+        for name in names:
+            seconds, measurements = run_benchmark(BENCHMARKS[name], workdir, repeat)
+            results.append({'benchmark': name, 'scale': scale, 'sizes': sizes, 'seconds': seconds, 'best': min(seconds),
+                            **measurements})
+            extra = ''.join(f"  {key} {value}" for key, value in measurements.items())
+            print(f"{name:<24} {scale:>5}x  best {min(seconds):8.3f}s  ({', '.join(f'{s:.3f}' for s in seconds)}){extra}")
+        return results
+    finally:
+        os.chdir(cwd)
+        if not keep_data:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def compare_to_baseline(results, baseline_file):
+    """Print how each benchmark moved against an earlier results file"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {(r['benchmark'], r['scale']): r['best'] for r in json.load(f)['results']}
+    print(f"\nCompared to {baseline_file}:")
+    for result in results:
+        before = baseline.get((result['benchmark'], result['scale']))
+        if before:
+            print(f"{result['benchmark']:<24} {result['scale']:>5}x  {before:8.3f}s -> {result['best']:8.3f}s"
+                  f"  ({result['best'] / before:.2f}x)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scripts on synthetic data at several scales")
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES, help="Multipliers of the base input sizes")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per benchmark; the best one is reported")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic data")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="JSON file to record the results in")
+    parser.add_argument('--baseline', default=None, help="Earlier results file to compare against")
+    parser.add_argument('--keep-data', action='store_true', help="Leave the generated inputs and outputs in place")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scales:
+        scale = int(scale) if float(scale).is_integer() else scale
+        results += run_scale(scale, args.seed, args.only, args.repeat, args.keep_data)
+
+    report = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        compare_to_baseline(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
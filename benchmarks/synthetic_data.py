@@ -0,0 +1,255 @@
+# Seeded fake versions of the private inputs, at any size, for benchmarking the scripts.
+import argparse
+import csv
+import json
+import os
+import random
+import unicodedata
+from datetime import date, timedelta
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Row counts at scale 1
+BASE_SIZES = {
+    'projects': 100,
+    'assessors': 500,
+    'contacts': 1000,
+    'language_rows': 1000,
+    'date_rows': 2000,
+}
+
+FIRST_NAMES = ['Ana', 'José', 'Maria', 'John', 'Li', 'Wei', 'Fatima', 'Olga', 'Pieter', 'Chipo', 'Nomsa', 'Ahmed',
+               'Sofía', 'Jürgen', 'Ayşe', 'Thabo', 'Carlos', 'Priya', 'Kenji', 'Élodie', 'Bat-Erdene', 'Tomás']
+LAST_NAMES = ['Silva', 'Pérez', 'Smith', 'Nguyen', 'Müller', 'Moyo', 'Dlamini', 'Khan', 'Ivanova', 'van der Merwe',
+              'García', 'Chen', 'Okafor', 'Yılmaz', 'Tanaka', "O'Brien", 'Dubois', 'Batbayar', 'Rossi', 'Kowalski']
+SITE_NAMES = ['Mine', 'Smelter', 'Refinery', 'Concentrator', 'Mill', 'Tailings Facility']
+PLACES = ['Antofagasta', 'Kolwezi', 'Copperbelt', 'Atacama', 'Côte Nord', 'Sudbury', 'Erdenet', 'Grasberg', 'Kitwe']
+COMPANIES = ['Andes Copper', 'Zambezi Metals', 'Northern Minerals plc', 'Ferro & Cobre S.A.', 'Grupo Minero', '']
+FIRMS = ['Assessor Co', 'Audit Partners Ltd', 'Due Diligence GmbH', 'Minería Consultores', '']
+DATE_FORMATS = ['%d-%b-%Y', '%d-%b-%y', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y']
+NOT_DATES = ['TBC', 'n/a', 'N/A', 'pending', 'tbc 2024', 'see notes', 'Q3']
+NOTES = ['Awaiting documents', 'Follow up with site', 'Réunion prévue', 'Extension agreed – see email',
+         'Sent “final” version', 'OK', 'Rescheduled due to weather']
+LANGUAGES = ['English', 'Spanish', 'French', 'German', 'Portuguese', 'Italian', 'Russian', 'Chinese', 'Japanese',
+             'Turkish', 'Mongolian', 'Indonesian', 'Afrikaans', 'Shona', 'Thai', 'Polish', 'Swedish', 'Bahasa Indonesia']
+LANGUAGE_TYPOS = ['Englis', 'Spanis', 'Portugues', 'Japanes', 'Frenc', 'Romanain', 'Español', 'Français', 'Deutsch']
+PROFICIENCIES = ['mother tongue', 'native', 'fluent', 'professional', 'C2', 'business', 'intermediate', 'middle',
+                 'basic', 'elementary', 'average', '']
+ENRICHMENT_EXPERTISE_COLS = ['1. Environmental', '2. Social', '4. Supply Chain Due Diligence']
+# The X columns assessor_transform.py collapses into one Expertise column
+TRANSFORM_EXPERTISE_COLS = [
+    'Environmental management systems', 'Occupational health and safety management systems',
+    'Labor, industrial relations, and human resources management systems',
+    'Social impact assessments and human rights due diligence', 'Community relations and stakeholder engagement;',
+    'Compliance and ethics', 'Mineral supply chain due diligence', 'Sustainability reporting',
+    'Experience with local communities',
+]
+
+def scaled_sizes(scale):
+    return {name: max(1, int(count * scale)) for name, count in BASE_SIZES.items()}
+
+def person_name(rng):
+    first = rng.choice(FIRST_NAMES)
+    if rng.random() < 0.2:
+        first = f"{first} {rng.choice(FIRST_NAMES)}"
+    return f"{first} {rng.choice(LAST_NAMES)} {rng.randint(1, 9999)}"
+
+def name_variant(rng, name):
+    """The same person written differently: case, accents, spacing, word order or a dropped middle name"""
+    choice = rng.randrange(5)
+    if choice == 0:
+        return name.upper()
+    if choice == 1:
+        return ''.join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
+    if choice == 2:
+        return name.replace(' ', '  ', 1)
+    words = name.split()
+    if choice == 3 and len(words) > 3:
+        return ' '.join(words[:1] + words[2:])
+    return ' '.join(words[1:] + words[:1])
+
+def messy_date(rng):
+    if rng.random() < 0.1:
+        return rng.choice(NOT_DATES)
+    day = date(2019, 1, 1) + timedelta(days=rng.randint(0, 2500))
+    return day.strftime(rng.choice(DATE_FORMATS))
+
+def write_csv(path, header, rows, encoding='utf-8'):
+    with open(path, 'w', newline='', encoding=encoding, errors='replace') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def participants_columns(template):
+    """The export's columns: every column the template reads, plus a few it doesn't"""
+    # Like the real export, the repeated Notes and Determination columns are written once per stage
+    columns = ['Unique Copper Mark number', 'Site Name', 'Parent Company (if Applicable)', 'Stage Name']
+    for stage in template['stages']:
+        for task in stage['tasks']:
+            name = task if isinstance(task, str) else task['name']
+            columns += [name, f"{name} Notes"]
+        columns += [task['column'] for task in stage.get('additional_tasks', [])]
+        columns.append(f"{stage['name']} Notes")
+    columns += ['Country', 'Region', 'Metal', 'Contact Email', 'Last Modified']
+    return columns
+
+def generate_participants(path, projects, rng, encoding='cp1252'):
+    """Participants export with reassessment duplicates, mixed date formats and a legacy encoding"""
+    with open(os.path.join(REPO_DIR, 'export_template.json'), 'r', encoding='utf-8') as f:
+        template = json.load(f)
+    columns = participants_columns(template)
+    stages = [stage['name'] for stage in template['stages']]
+
+    rows = []
+    for number in range(1, projects + 1):
+        site = f"{rng.choice(PLACES)} {rng.choice(SITE_NAMES)}"
+        company = rng.choice(COMPANIES)
+        # About one project in ten has been reassessed and appears again
+        for _ in range(1 + (rng.random() < 0.1) + (rng.random() < 0.02)):
+            row = []
+            for col in columns:
+                r = rng.random()
+                if r < 0.35:
+                    row.append('')
+                elif col.endswith('Notes') or col == 'Notes':
+                    row.append(rng.choice(NOTES))
+                elif col == 'Number of Days On-Site':
+                    # Typed in by hand, so now and then with a space around it
+                    row.append(rng.choice(['', '', '', ' ', '  ']) + str(rng.randint(1, 6)) + rng.choice(['', '', ' ']))
+                elif col == 'Re-assessment triggered':
+                    # A checkbox column, spelled as the export tool and spreadsheets variously write it
+                    row.append(rng.choice(['TRUE', 'FALSE', 'true', 'false', 'True', 'False']))
+                elif col == 'Assessment Firm (if applicable)':
+                    row.append(rng.choice(FIRMS))
+                else:
+                    row.append(messy_date(rng))
+            fixed = {
+                'Unique Copper Mark number': f"P{number:04d}",
+                'Site Name': site,
+                'Parent Company (if Applicable)': company,
+                'Stage Name': rng.choice(stages),
+                'Country': rng.choice(PLACES),
+                'Contact Email': f"site{number}@example.com",
+            }
+            for col, value in fixed.items():
+                row[columns.index(col)] = value
+            rows.append(row)
+    rng.shuffle(rows)
+    write_csv(path, columns, rows, encoding)
+
+def generate_assessor_details(directory, assessors, rng):
+    """TSM_Assessor_Details.csv and the All_Assessors_JF.csv master list it is joined to"""
+    with open(os.path.join(REPO_DIR, 'category_mapping.json'), 'r', encoding='utf-8') as f:
+        categories = list(json.load(f)['categories']) + ['Unknown area', 'Other']
+    names = [person_name(rng) for _ in range(assessors)]
+
+    tsm_rows = []
+    for name in names:
+        expertise = '; '.join(rng.sample(categories, rng.randint(0, 4)))
+        tsm_rows.append([name if rng.random() < 0.9 else name_variant(rng, name), expertise])
+    write_csv(os.path.join(directory, 'TSM_Assessor_Details.csv'), ['Full Name', 'Expertise'], tsm_rows)
+
+    master_rows = []
+    for name in names + [person_name(rng) for _ in range(assessors)]:
+        # Some assessors are missing from the master list and a few are listed twice
+        copies = 0 if rng.random() < 0.05 else 1 + (rng.random() < 0.03)
+        for _ in range(copies):
+            master_rows.append([name, rng.choice(['BSc Geology', 'MSc Environmental Science', 'PhD', '', 'MBA'])]
+                               + [rng.choice(['YES', 'NO', 'SI', '', 'Yes ', 'maybe']) for _ in ENRICHMENT_EXPERTISE_COLS])
+    rng.shuffle(master_rows)
+    write_csv(os.path.join(directory, 'All_Assessors_JF.csv'), ['Full Name', 'Education'] + ENRICHMENT_EXPERTISE_COLS,
+              master_rows)
+
+def generate_contact_lists(directory, contacts, rng):
+    """Assessor and verifier lists that overlap, with some shared people spelled differently"""
+    # The differently spelled pairs are written to planted_name_pairs.csv, so fuzzy matching recall can be checked
+    people = [person_name(rng) for _ in range(contacts)]
+    assessors, verifiers, planted = [], [], []
+    for name in people:
+        r = rng.random()
+        if r < 0.5:
+            assessors.append(name)
+            variant = name if rng.random() < 0.8 else name_variant(rng, name)
+            verifiers.append(variant)
+            if variant != name:
+                planted.append([name, variant])
+        elif r < 0.75:
+            assessors.append(name)
+        else:
+            verifiers.append(name)
+    write_csv(os.path.join(directory, 'TSM_Assessor_List_New.csv'), ['Full Name'], [[name] for name in assessors])
+    write_csv(os.path.join(directory, 'TSM_Verifier_List_CSV.csv'), ['Full Name'], [[name] for name in verifiers])
+    write_csv(os.path.join(directory, 'planted_name_pairs.csv'), ['Assessor', 'Verifier'], planted)
+
+def language_entry(rng):
+    parts = []
+    for i in range(rng.randint(1, 4)):
+        language = rng.choice(LANGUAGES if rng.random() < 0.8 else LANGUAGE_TYPOS)
+        proficiency = 'mother tongue' if i == 0 and rng.random() < 0.5 else rng.choice(PROFICIENCIES)
+        if rng.random() < 0.2:
+            language = f"{language} ({rng.choice(['B2', 'C1', 'written', 'spoken'])})"
+        parts.append(f"{language} - {proficiency}" if proficiency else language)
+    entry = rng.choice([', ', ',', '; ']).join(parts)
+    return f'"{entry}"' if rng.random() < 0.1 else entry
+
+def generate_language_sheet(path, rows, rng):
+    """Multi-column language sheet where most entries repeat"""
+    pool = [language_entry(rng) for _ in range(max(10, rows // 10))]
+    columns = ['Languages 1', 'Languages 2', 'Languages 3']
+    write_csv(path, columns, [[rng.choice(pool) if rng.random() < 0.7 else '' for _ in columns] for _ in range(rows)])
+
+def generate_assessor_dates(path, rows, rng):
+    """Assessor dates mostly in the export's DD-MMM-YY form, with blanks, other formats and a few non-dates"""
+    columns = ['Full Name', 'Approval Date', 'Expiry Date', 'Last Training', 'Status']
+    data = []
+    for _ in range(rows):
+        row = [person_name(rng)]
+        for _ in range(3):
+            r = rng.random()
+            if r < 0.15:
+                row.append('')
+            elif r < 0.8:
+                day = date(2015, 1, 1) + timedelta(days=rng.randint(0, 4000))
+                row.append(day.strftime('%d-%b-%y').upper())
+            else:
+                row.append(messy_date(rng))
+        row.append(rng.choice(['Approved', 'Partially approved', 'Expired', '']))
+        data.append(row)
+    write_csv(path, columns, data)
+
+def generate_partially_approved(path, assessors, rng):
+    """The partially approved assessor list, with an X column per expertise marked in varying case and spacing"""
+    columns = ['Name', 'Email', 'Organisation'] + TRANSFORM_EXPERTISE_COLS + ['Comments']
+    rows = []
+    for number in range(1, assessors + 1):
+        marks = [rng.choice(['X', 'x', ' X', 'X ']) if rng.random() < 0.3 else '' for _ in TRANSFORM_EXPERTISE_COLS]
+        rows.append([person_name(rng), f"assessor{number}@example.com", rng.choice(FIRMS)] + marks
+                    + [rng.choice(NOTES) if rng.random() < 0.2 else ''])
+    write_csv(path, columns, rows)
+
+def generate_all(directory, scale=1, seed=0):
+    """Write every synthetic input for one scale into directory and return the row counts used"""
+    os.makedirs(directory, exist_ok=True)
+    sizes = scaled_sizes(scale)
+    rng = random.Random(seed)
+    generate_participants(os.path.join(directory, 'Participants.csv'), sizes['projects'], rng)
+    generate_assessor_details(directory, sizes['assessors'], rng)
+    generate_contact_lists(directory, sizes['contacts'], rng)
+    generate_language_sheet(os.path.join(directory, 'assessor_languages.csv'), sizes['language_rows'], rng)
+    generate_assessor_dates(os.path.join(directory, 'assessor_dates.csv'), sizes['date_rows'], rng)
+    generate_partially_approved(os.path.join(directory, 'Assessor list 2025 - partially approved.csv'),
+                                sizes['assessors'], rng)
+    return sizes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write seeded fake versions of the script inputs")
+    parser.add_argument('--output-dir', required=True, help="Directory to write the CSV files to")
+    parser.add_argument('--scale', type=float, default=1, help="Multiplier for the row counts")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the random generator")
+    args = parser.parse_args(argv)
+
+    sizes = generate_all(args.output_dir, args.scale, args.seed)
+    print(f"Synthetic inputs written to {args.output_dir}: {json.dumps(sizes)}")
+
+if __name__ == "__main__":
+    main()
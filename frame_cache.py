@@ -0,0 +1,69 @@
+import hashlib
+import os
+import pickle
+import time
+from run_report import add_stage_time, count, log
+
+FRAME_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.frame_cache')
+
+def frame_cache_key(file_path, read_options):
+    """Identify one parse of one file: where it is, what it looked like, and how it was read"""
+    stat = os.stat(file_path)
+    return {
+        'path': os.path.abspath(file_path),
+        'stat': f"{stat.st_size}|{stat.st_mtime_ns}",
+        'options': repr(sorted(read_options.items())),
+    }
+
+def frame_cache_file(key):
+    # One entry per path and read options, so a changed source overwrites its old entry
+    name = hashlib.sha1(f"{key['path']}|{key['options']}".encode('utf-8')).hexdigest()[:16]
+    return os.path.join(FRAME_CACHE_DIR, f"{name}.pkl")
+
+def load_cached_frame(cache_file, key):
+    try:
+        with open(cache_file, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception:
+        # A cache pickled by another pandas or numpy version can fail with almost any error; it is just a miss
+        return None
+    if not isinstance(entry, dict) or entry.get('key') != key:
+        return None
+    return entry
+
+def save_cached_frame(cache_file, key, df, parse_seconds):
+    temp_file = f"{cache_file}.tmp"
+    try:
+        os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+        with open(temp_file, 'wb') as f:
+            pickle.dump({'key': key, 'parse_seconds': parse_seconds, 'frame': df}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        log(f"Warning: could not write frame cache for {key['path']}: {str(e)}", 'warnings')
+
+def read_csv_cached(file_path, cache=True, **read_options):
+    """pd.read_csv that reuses the parsed frame while the file's size and mtime are unchanged"""
+    import pandas as pd
+    if not cache:
+        return pd.read_csv(file_path, **read_options)
+
+    key = frame_cache_key(file_path, read_options)
+    cache_file = frame_cache_file(key)
+    start = time.perf_counter()
+    entry = load_cached_frame(cache_file, key)
+    if entry is not None:
+        elapsed = time.perf_counter() - start
+        saved = entry['parse_seconds'] - elapsed
+        add_stage_time('frame cache load', elapsed)
+        count('rows read', len(entry['frame']))
+        log(f"Frame cache hit for {os.path.basename(file_path)}: loaded in {elapsed:.3f}s, saved {saved:.3f}s", 'summary')
+        return entry['frame']
+
+    start = time.perf_counter()
+    df = pd.read_csv(file_path, **read_options)
+    parse_seconds = time.perf_counter() - start
+    add_stage_time('csv parse', parse_seconds)
+    count('rows read', len(df))
+    log(f"Frame cache miss for {os.path.basename(file_path)}: parsed in {parse_seconds:.3f}s", 'summary')
+    save_cached_frame(cache_file, key, df, parse_seconds)
+    return df
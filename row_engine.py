@@ -0,0 +1,173 @@
+import csv
+import io
+import os
+import re
+
+ENGINES = ('auto', 'pandas', 'rows')
+# With --engine auto, inputs up to this many bytes in total are handled with the csv module, which skips
+# the pandas import. Time both engines with --engine on your own files to move the line.
+ROWS_ENGINE_MAX_BYTES = 16 * 1024 * 1024
+
+# The strings pandas.read_csv reads as missing by default, so both engines see the same empty cells
+NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+def is_missing(value):
+    """None or NaN, without needing pandas for pd.isna"""
+    return value is None or (isinstance(value, float) and value != value)
+
+def is_row_table(table):
+    """True for a {'columns': header, 'rows': rows} table from the rows engine, False for a pandas DataFrame"""
+    return isinstance(table, dict)
+
+def choose_engine(engine, *paths):
+    """Resolve 'auto' to 'rows' for small inputs and 'pandas' for large ones"""
+    if engine != 'auto':
+        return engine
+    total = sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+    return 'rows' if total <= ROWS_ENGINE_MAX_BYTES else 'pandas'
+
+def dedupe_header(header):
+    """Rename repeated column names the way pandas.read_csv does, so the second 'Notes' becomes 'Notes.1'"""
+    # A name is skipped if the header already has it, e.g. with 'Notes', 'Notes', 'Notes.1' the second is 'Notes.2'
+    names = set(header)
+    counts = {}
+    renamed = []
+    for col in header:
+        count = counts.get(col, 0)
+        if count > 0:
+            base = col
+            while count > 0:
+                counts[base] = count + 1
+                col = f"{base}.{count}"
+                count = count + 1 if col in names else counts.get(col, 0)
+        renamed.append(col)
+        counts[col] = count + 1
+    return renamed
+
+def read_csv_rows(file_path, encoding='utf-8', text=None, columns=None):
+    """Header and rows of a CSV file, with the cells pandas would read as missing set to None"""
+    # columns, if given, keeps only those columns, dropping the others row by row as the file is read
+    if text is None:
+        with open(file_path, 'r', newline='', encoding=encoding) as f:
+            text = f.read()
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    # newline='' leaves line breaks to the csv module, which like pandas only ends rows at \r and \n
+    reader = csv.reader(io.StringIO(text, newline=''))
+    header = dedupe_header(next(reader, []))
+    positions = [position for position, col in enumerate(header) if columns is None or col in columns]
+    rows = []
+    for row in reader:
+        if not row:
+            continue  # pandas skips blank lines
+        # Short rows are padded like pandas pads them
+        if len(row) < len(header):
+            row += [''] * (len(header) - len(row))
+        rows.append([None if row[position] in NA_VALUES else row[position] for position in positions])
+    return [header[position] for position in positions], rows
+
+# What pandas accepts as a number: ASCII digits or an infinity, with whitespace around it
+NUMBER_SPACE = ' \t\n\v\f\r'
+INT_TEXT = re.compile(r'[+-]?[0-9]+')
+FLOAT_TEXT = re.compile(r'[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][+-]?[0-9]+)?|[+-]?inf(inity)?', re.IGNORECASE)
+FLOAT_PARTS = re.compile(r'([+-]?)([0-9]*)(?:\.([0-9]*))?(?:[eE]([+-]?[0-9]+))?')
+POWERS_OF_TEN = [float(f'1e{k}') for k in range(309)]
+# pandas reads these as booleans in any case, e.g. 'TRUE', 'true' and 'tRuE', but not with whitespace around them
+BOOL_TEXT = {'true': 'True', 'false': 'False'}
+
+def pandas_float(text):
+    """float(text) worked out the way pandas' default parser does, which can differ from Python in the last digit"""
+    # pandas keeps the first 17 digits in a float and scales it by a power of ten, rather than rounding correctly
+    parts = FLOAT_PARTS.fullmatch(text)
+    if parts is None:
+        return float(text)  # an infinity
+    sign, whole, fraction, exponent_text = parts.groups()
+    number, digits, exponent = 0.0, 0, 0
+    for digit in whole:
+        if digits < 17:
+            number = number * 10.0 + int(digit)
+            digits += 1
+        else:
+            exponent += 1
+    for digit in (fraction or '')[:max(0, 17 - digits)]:
+        number = number * 10.0 + int(digit)
+        digits += 1
+        exponent -= 1
+    if sign == '-':
+        number = -number
+    exponent += int(exponent_text or 0)
+    if exponent > 308:
+        return float(text)  # out of range for pandas too, which then falls back on Python
+    if exponent > 0:
+        return number * POWERS_OF_TEN[exponent]
+    if exponent < -616:
+        return 0.0
+    if exponent < -308:
+        return number / POWERS_OF_TEN[-308 - exponent] / POWERS_OF_TEN[308]
+    return number / POWERS_OF_TEN[-exponent]
+
+def new_column_kind():
+    """What the cells of a column seen so far could all be read as, updated by scan_column"""
+    return {'seen': False, 'blanks': False, 'bool': True, 'number': True, 'ints': True, 'overflow': False}
+
+def scan_column(kind, cells, total):
+    """Update kind with a column's non-missing cells out of total rows, e.g. one chunk of a file at a time"""
+    kind['blanks'] = kind['blanks'] or len(cells) < total
+    if not cells:
+        return kind
+    kind['seen'] = True
+    if kind['bool']:
+        kind['bool'] = all(cell.lower() in BOOL_TEXT for cell in cells)
+    if kind['number']:
+        kind['number'] = all(FLOAT_TEXT.fullmatch(cell.strip(NUMBER_SPACE)) for cell in cells)
+    if kind['number']:
+        ints = [int(cell) for cell in (cell.strip(NUMBER_SPACE) for cell in cells) if INT_TEXT.fullmatch(cell)]
+        kind['ints'] = kind['ints'] and len(ints) == len(cells)
+        # What pandas does with integers past int64 depends on where they are, so such columns are left as written
+        kind['overflow'] = kind['overflow'] or bool(ints) and not -2 ** 63 <= min(ints) <= max(ints) < 2 ** 63
+    return kind
+
+def column_text(kind):
+    """A function rewriting a cell of a column of this kind as pandas would print it, or None to leave it as written"""
+    if not kind['seen']:
+        return None
+    if kind['bool']:
+        return lambda cell: BOOL_TEXT[cell.lower()]
+    if not kind['number'] or kind['overflow']:
+        return None
+    if not kind['ints']:
+        return lambda cell: str(pandas_float(cell.strip(NUMBER_SPACE)))
+    # Integers with blanks among them are read as integers and then turned into floats, not parsed as floats
+    if kind['blanks']:
+        return lambda cell: str(float(int(cell.strip(NUMBER_SPACE))))
+    return lambda cell: str(int(cell.strip(NUMBER_SPACE)))
+
+def infer_column_text(header, rows, skip=()):
+    """Rewrite numeric and true/false columns as pandas would print them, e.g. ' 4' as '4.0' in a column with blanks"""
+    # skip names columns that pandas reads as text whatever they hold, such as the categoricals
+    for position, col in enumerate(header):
+        if col in skip:
+            continue
+        cells = [row[position] for row in rows if row[position] is not None]
+        convert = column_text(scan_column(new_column_kind(), cells, len(rows)))
+        if convert is None:
+            continue
+        for row in rows:
+            if row[position] is not None:
+                row[position] = convert(row[position])
+
+def read_column(file_path, column, encoding='utf-8'):
+    """The non-missing values of one column, in file order"""
+    header, rows = read_csv_rows(file_path, encoding)
+    position = header.index(column)
+    return [row[position] for row in rows if row[position] is not None]
+
+def write_csv_rows(file_path, header, rows):
+    """Write rows the way DataFrame.to_csv(index=False) does: minimal quoting, None as empty, os.linesep"""
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(header)
+        writer.writerows(['' if cell is None else cell for cell in row] for row in rows)
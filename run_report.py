@@ -0,0 +1,106 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+REPORT_FILE = 'run_report.json'
+# Each message is logged at one of these levels; a run shows the messages at its level and the ones after it
+LOG_LEVELS = ('items', 'summary', 'warnings')
+
+def new_run(name, log_level='items'):
+    return {'name': name, 'log_level': log_level, 'started': datetime.now().isoformat(timespec='seconds'),
+            'clock': time.perf_counter(), 'stages': {}, 'counters': {}}
+
+# The run being recorded; scripts that never start one still log at the 'items' level
+current_run = new_run('run')
+# Writer threads add to the same stages and counters as the main thread
+record_lock = threading.Lock()
+
+def start_run(name, log_level='items'):
+    """Start recording stage timings and counters for a new run"""
+    global current_run
+    current_run = new_run(name, log_level)
+    return current_run
+
+def log(message, level='items'):
+    if LOG_LEVELS.index(level) >= LOG_LEVELS.index(current_run['log_level']):
+        print(message)
+
+def add_stage_time(name, seconds, calls=1):
+    with record_lock:
+        entry = current_run['stages'].setdefault(name, {'seconds': 0.0, 'calls': 0})
+        entry['seconds'] += seconds
+        entry['calls'] += calls
+
+@contextlib.contextmanager
+def stage(name):
+    """Add the time spent in the block to the named stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_stage_time(name, time.perf_counter() - start)
+
+def timed_iter(name, iterable):
+    """Yield from iterable, adding the time spent producing each item to the named stage"""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            add_stage_time(name, time.perf_counter() - start, calls=0)
+            return
+        add_stage_time(name, time.perf_counter() - start)
+        yield item
+
+def count(name, amount=1):
+    with record_lock:
+        current_run['counters'][name] = current_run['counters'].get(name, 0) + int(amount)
+
+def snapshot():
+    """Stage timings and counters recorded so far, e.g. to send back from a worker process"""
+    return {'stages': current_run['stages'], 'counters': current_run['counters']}
+
+def merge(recorded):
+    """Add the stage timings and counters of a snapshot (from a worker) to the current run"""
+    for name, entry in recorded['stages'].items():
+        add_stage_time(name, entry['seconds'], entry['calls'])
+    for name, amount in recorded['counters'].items():
+        count(name, amount)
+
+@contextlib.contextmanager
+def worker_run(log_level):
+    """Record a worker's share of the run separately, at the parent's log level"""
+    global current_run
+    parent = current_run
+    current_run = new_run(parent['name'], log_level)
+    try:
+        yield current_run
+    finally:
+        current_run = parent
+
+def finish_run(report_file=REPORT_FILE):
+    """Write the JSON report for the run (unless report_file is None) and log where the time went"""
+    report = {
+        'name': current_run['name'],
+        'started': current_run['started'],
+        'seconds': round(time.perf_counter() - current_run['clock'], 3),
+        'stages': {name: {'seconds': round(entry['seconds'], 3), 'calls': entry['calls']}
+                   for name, entry in sorted(current_run['stages'].items(), key=lambda item: -item[1]['seconds'])},
+        'counters': dict(sorted(current_run['counters'].items())),
+    }
+    stages = ', '.join(f"{name} {entry['seconds']:.2f}s" for name, entry in report['stages'].items())
+    log(f"Finished in {report['seconds']:.2f}s" + (f" ({stages})" if stages else ''), 'summary')
+
+    if report_file:
+        try:
+            with open(report_file + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            os.replace(report_file + '.tmp', report_file)
+            log(f"Run report written to {report_file}", 'summary')
+        except OSError as e:
+            log(f"Warning: could not write run report {report_file}: {str(e)}", 'warnings')
+    return report